@@ -0,0 +1,173 @@
+"""
+In-process TTL cache for read-mostly endpoints.
+"""
+import asyncio
+import functools
+import hashlib
+from contextvars import ContextVar
+
+from cachetools import TTLCache
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import literal_column, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Listener, Post
+
+# One TTLCache per TTL, keyed by the TTL in seconds
+_caches: dict[int, TTLCache] = {}
+_locks: dict[tuple, asyncio.Lock] = {}
+
+# Data version the current request's ETag was derived from (set by check_etag).
+# It is part of the cache key, so a cached body is only ever sent with the ETag
+# of the data it was computed from.
+_request_version: ContextVar[str | None] = ContextVar("request_version", default=None)
+
+
+def _make_key(prefix: str, name: str, kwargs: dict) -> tuple:
+    """Build a cache key from the endpoint name, its query parameters and the data version."""
+    params = tuple(
+        sorted(
+            (param, value)
+            for param, value in kwargs.items()
+            if not isinstance(value, (AsyncSession, Request, Response))
+        )
+    )
+    return (prefix, name, params, _request_version.get())
+
+
+def _get_cache(ttl: int) -> TTLCache:
+    """Return the cache holding entries with the given TTL."""
+    if ttl not in _caches:
+        _caches[ttl] = TTLCache(maxsize=settings.cache_maxsize, ttl=ttl)
+    return _caches[ttl]
+
+
+def cached(prefix: str, ttl: int | None = None):
+    """
+    Cache an endpoint's return value for `ttl` seconds (default `settings.cache_ttl`).
+
+    The key is the prefix, the endpoint name and its parameters (sessions,
+    requests and responses are ignored), plus the data version set by
+    check_etag for this request, if any. Concurrent misses for the same key
+    wait on a lock so only one of them hits the database.
+    """
+
+    cache = _get_cache(ttl or settings.cache_ttl)
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = _make_key(prefix, func.__name__, kwargs)
+            value = cache.get(key)
+            if value is not None:
+                return value
+
+            lock = _locks.setdefault(key, asyncio.Lock())
+            async with lock:
+                value = cache.get(key)
+                if value is None:
+                    value = await func(*args, **kwargs)
+                    cache[key] = value
+            _locks.pop(key, None)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate(*prefixes: str) -> None:
+    """Drop cached entries for the given prefixes (all entries if none given)."""
+    for cache in _caches.values():
+        if not prefixes:
+            cache.clear()
+            continue
+        for key in list(cache.keys()):
+            if key[0] in prefixes:
+                cache.pop(key, None)
+
+
+async def cache_control(response: Response) -> None:
+    """Dependency that lets clients reuse cached responses for the cache TTL."""
+    response.headers["Cache-Control"] = f"public, max-age={settings.cache_ttl}"
+
+
+# Sequences bumped by the collector and by triggers on posts (see init.sql)
+DATASET_SEQUENCES = ("rollup_refresh_seq", "posts_delete_seq")
+
+
+async def _posts_version(
+    session: AsyncSession, listener_ids: list[int] | None, sequences: tuple[str, ...]
+) -> str:
+    """Latest collected_at of the listeners' posts plus the current values of `sequences`."""
+    query = select(
+        func.max(Post.collected_at),
+        *(literal_column(f"(SELECT last_value FROM {sequence})") for sequence in sequences),
+    )
+    if listener_ids:
+        query = query.where(Post.listener_id.in_(listener_ids))
+    latest, *values = (await session.execute(query)).one()
+    return ":".join([latest.isoformat() if latest else "", *map(str, values)])
+
+
+async def dataset_version(session: AsyncSession, listener_ids: list[int] | None = None) -> str:
+    """
+    Version tag for the collected posts of the given listeners.
+
+    Uses the latest collected_at, which is an index-only lookup. Engagement
+    counters refreshed on already-collected posts do not change it, so only
+    use it for responses derived from the set of posts and their NLP results,
+    and post_version for responses that include the posts' own columns.
+    It also includes the rollup refresh sequence, which the collector bumps
+    after refreshing the materialized rollups, so responses read from those
+    views get a new tag once they catch up with the posts, and the post
+    delete sequence, which a trigger on posts bumps on every delete.
+    """
+    return await _posts_version(session, listener_ids, DATASET_SEQUENCES)
+
+
+async def post_version(session: AsyncSession, listener_ids: list[int] | None = None) -> str:
+    """
+    Version tag for responses that include the posts' own columns.
+
+    Adds the post update sequence to dataset_version's tag. A trigger on posts
+    bumps it after every statement that changes rows, which catches refreshed
+    engagement counters and stored NLP results.
+    """
+    return await _posts_version(session, listener_ids, (*DATASET_SEQUENCES, "posts_update_seq"))
+
+
+async def listeners_version(
+    session: AsyncSession,
+    is_active: bool | None = None,
+    platform: str | None = None,
+) -> str:
+    """
+    Version tag for the listeners matching the given filters.
+
+    The latest updated_at catches edits, the row count catches deletes.
+    """
+    query = select(func.max(Listener.updated_at), func.count())
+    if is_active is not None:
+        query = query.where(Listener.is_active == is_active)
+    if platform:
+        query = query.where(Listener.platform == platform)
+    latest, count = (await session.execute(query)).one()
+    return f"{latest.isoformat() if latest else ''}:{count}"
+
+
+def check_etag(request: Request, response: Response, version: str) -> None:
+    """
+    Set an ETag derived from the dataset version and request URL.
+
+    Raises a 304 Not Modified when the client already holds this version, so
+    the endpoint body (and its aggregation queries) never runs. Otherwise
+    the version becomes part of the endpoint's cache key.
+    """
+    _request_version.set(version)
+    digest = hashlib.md5(f"{version}|{request.url.path}|{request.url.query}".encode()).hexdigest()
+    etag = f'"{digest}"'
+    if request.headers.get("if-none-match") == etag:
+        raise HTTPException(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
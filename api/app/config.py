@@ -4,12 +4,23 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     # Database
     database_url: str = "postgresql+asyncpg://postgres:postgres@db:5432/sociallistener"
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_pre_ping: bool = True
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    # Per-connection prepared statement cache (set to 0 behind a transaction-mode pooler)
+    db_statement_cache_size: int = 512
 
     # API
     api_title: str = "Social Listener API"
     api_version: str = "0.1.0"
     debug: bool = False
 
+    # Response cache (seconds / entries)
+    cache_ttl: int = 30
+    cache_maxsize: int = 512
+
     # Logging
     log_level: str = "INFO"
 
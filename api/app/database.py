@@ -1,3 +1,6 @@
+import asyncio
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
@@ -6,12 +9,25 @@ from app.config import settings
 engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    connect_args={
+        # SQLAlchemy's and asyncpg's statement caches, so repeated queries skip parsing
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+        "statement_cache_size": settings.db_statement_cache_size,
+        # Short analytics queries don't benefit from JIT compilation
+        "server_settings": {"jit": "off"},
+    },
 )
 
 async_session = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False,
+    autoflush=False,
 )
 
 
@@ -22,3 +38,24 @@ class Base(DeclarativeBase):
 async def get_session() -> AsyncSession:
     async with async_session() as session:
         yield session
+
+
+async def warm_pool() -> None:
+    """Open `db_pool_size` connections up front so the first requests don't pay for connecting."""
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(ping() for _ in range(settings.db_pool_size)))
+
+
+def pool_stats() -> dict:
+    """Current connection pool usage."""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
@@ -1,18 +1,21 @@
 import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
 
+import httpx
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 
 from app.config import settings
+from app.database import pool_stats, warm_pool
 from app.routes import api_router
-from app.routes.views import router as views_router
+from app.routes.listeners import COLLECTOR_URL
+from app.routes.views import precompile_templates, render_pages, router as views_router
 
-# Template and static directories
+# Static directory (templates are loaded by app.routes.views)
 BASE_DIR = Path(__file__).resolve().parent
-templates = Jinja2Templates(directory=BASE_DIR / "templates")
 
 # Configure logging
 logging.basicConfig(
@@ -21,6 +24,31 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan handler."""
+    precompile_templates()
+    render_pages()
+    logger.info("Page templates compiled and rendered")
+    try:
+        await warm_pool()
+        logger.info("Database pool warmed")
+    except Exception as e:
+        logger.warning(f"Could not warm database pool: {e}")
+
+    # Shared client so calls to the collector reuse keep-alive connections
+    app.state.http = httpx.AsyncClient(
+        base_url=COLLECTOR_URL,
+        timeout=60.0,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+    )
+    # In-flight collector calls by listener ID, shared by concurrent triggers
+    app.state.inflight = {}
+    yield
+    await app.state.http.aclose()
+
+
 app = FastAPI(
     title=settings.api_title,
     description="""
@@ -41,6 +69,8 @@ Monitor brand mentions across social media platforms.
     version=settings.api_version,
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -65,7 +95,7 @@ app.include_router(views_router)
 @app.get("/health")
 async def health():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "api"}
+    return {"status": "healthy", "service": "api", "db_pool": pool_stats()}
 
 
 @app.get("/api-info")
@@ -1,5 +1,5 @@
 from app.models.listener import Listener
-from app.models.post import Post
-from app.models.entity import Entity, PostEntity
+from app.models.post import Post, PostDailyCount
+from app.models.entity import Entity, EntityOccurrenceCount, PostEntity
 
-__all__ = ["Listener", "Post", "Entity", "PostEntity"]
+__all__ = ["Listener", "Post", "PostDailyCount", "Entity", "EntityOccurrenceCount", "PostEntity"]
@@ -43,3 +43,16 @@ class PostEntity(Base):
 
     def __repr__(self) -> str:
         return f"<PostEntity {self.post_id}->{self.entity_id}>"
+
+
+class EntityOccurrenceCount(Base):
+    """Read-only mapping of the entity_occurrence_counts materialized view."""
+
+    __tablename__ = "entity_occurrence_counts"
+
+    entity_id: Mapped[int] = mapped_column(Integer, ForeignKey("entities.id"), primary_key=True)
+    listener_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    occurrence_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<EntityOccurrenceCount {self.entity_id}@{self.listener_id}: {self.occurrence_count}>"
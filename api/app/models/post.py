@@ -49,3 +49,18 @@ class Post(Base):
 
     def __repr__(self) -> str:
         return f"<Post {self.id}: {self.platform}/{self.platform_post_id[:20]}>"
+
+
+class PostDailyCount(Base):
+    """Read-only mapping of the post_daily_counts materialized view."""
+
+    __tablename__ = "post_daily_counts"
+
+    day: Mapped[datetime | None] = mapped_column(DateTime, primary_key=True)
+    listener_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    platform: Mapped[str] = mapped_column(String(50), primary_key=True)
+    sentiment_label: Mapped[str | None] = mapped_column(String(50), primary_key=True)
+    post_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<PostDailyCount {self.day}/{self.listener_id}: {self.post_count}>"
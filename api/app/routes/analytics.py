@@ -1,25 +1,32 @@
+import asyncio
+import re
 from datetime import datetime, timedelta
 from typing import List
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select, func, and_, case
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy import Integer, Numeric, select, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_session
-from app.models import Post, Listener, Entity
+from app.cache import cache_control, cached, check_etag, dataset_version
+from app.database import async_session, get_session
+from app.models import Post, PostDailyCount, Listener, Entity
 from app.schemas import AnalyticsOverview, SentimentBreakdown, TimelinePoint, AuthorStats
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(cache_control)])
+
+# Labels produced by the collector's sentiment analyzer
+SENTIMENT_LABELS = ("positive", "negative", "neutral")
+
+# A valid listener_ids value holds only digits, commas and whitespace
+LISTENER_IDS_RE = re.compile(r"[\d,\s]*")
+ID_RE = re.compile(r"\d+")
 
 
 def parse_listener_ids(listener_ids: str | None) -> List[int] | None:
     """Parse comma-separated listener IDs into a list of integers."""
-    if not listener_ids:
-        return None
-    try:
-        return [int(id.strip()) for id in listener_ids.split(",") if id.strip()]
-    except ValueError:
+    if not listener_ids or not LISTENER_IDS_RE.fullmatch(listener_ids):
         return None
+    return [int(id) for id in ID_RE.findall(listener_ids)]
 
 
 def build_listener_filter(listener_ids: List[int] | None):
@@ -31,6 +38,14 @@ def build_listener_filter(listener_ids: List[int] | None):
     return Post.listener_id.in_(listener_ids)
 
 
+def rounded_avg(column, digits: int, default: int | None = 0):
+    """round(avg(column), digits) in SQL; NULL averages become `default` unless it is None."""
+    avg = func.avg(column)
+    if default is not None:
+        avg = func.coalesce(avg, default)
+    return func.round(avg.cast(Numeric), digits)
+
+
 def build_date_filter(days: int | None):
     """Build SQLAlchemy filter for date range based on post_created_at."""
     if not days:
@@ -39,92 +54,119 @@ def build_date_filter(days: int | None):
     return and_(Post.post_created_at.isnot(None), Post.post_created_at >= start_date)
 
 
-@router.get("/overview", response_model=AnalyticsOverview)
+def build_daily_filter(listener_ids: List[int] | None, days: int | None):
+    """
+    Build the listener and date filters for the post_daily_counts rollup.
+
+    The rollup is bucketed by day, so a `days` window starts at midnight of
+    its first day.
+    """
+    filters = []
+    if listener_ids:
+        filters.append(PostDailyCount.listener_id.in_(listener_ids))
+    if days:
+        start_date = datetime.utcnow() - timedelta(days=days)
+        filters.append(PostDailyCount.day >= start_date.replace(hour=0, minute=0, second=0, microsecond=0))
+    return and_(*filters) if filters else True
+
+
+def sum_posts(condition=None):
+    """Sum rollup post counts (optionally only rows matching `condition`) as an integer, 0 if none."""
+    total = func.sum(PostDailyCount.post_count)
+    if condition is not None:
+        total = total.filter(condition)
+    return func.coalesce(total, 0).cast(Integer)
+
+
+async def analytics_etag(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+):
+    """Answer conditional GETs with 304 while the listeners' posts are unchanged."""
+    parsed_ids = parse_listener_ids(request.query_params.get("listener_ids"))
+    version = await dataset_version(session, parsed_ids)
+    check_etag(request, response, version)
+
+
+async def fetch_all(query):
+    """Execute a query on its own session so it can run concurrently with others."""
+    async with async_session() as session:
+        result = await session.execute(query)
+        return result.mappings().all()
+
+
+@router.get(
+    "/overview",
+    response_model=AnalyticsOverview,
+    dependencies=[Depends(analytics_etag)],
+)
+@cached("analytics")
 async def analytics_overview(
     listener_ids: str | None = Query(None, description="Comma-separated listener IDs"),
     days: int | None = Query(None, ge=1, le=365, description="Filter to last N days"),
-    session: AsyncSession = Depends(get_session),
 ):
     """Get overall analytics summary."""
     now = datetime.utcnow()
     today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
     week_start = today_start - timedelta(days=7)
 
-    # Base query filters
+    # Post counts come from the daily rollup instead of scanning posts
     parsed_ids = parse_listener_ids(listener_ids)
-    listener_filter = build_listener_filter(parsed_ids)
-    date_filter = build_date_filter(days)
-
-    # Combined filter for posts
-    post_filter = and_(listener_filter, date_filter) if days else listener_filter
-
-    # Total posts (within date range if specified)
-    total_posts = (
-        await session.execute(select(func.count(Post.id)).where(post_filter))
-    ).scalar()
-
-    # Total listeners
-    total_listeners = (await session.execute(select(func.count(Listener.id)))).scalar()
-
-    # Total entities
-    total_entities = (await session.execute(select(func.count(Entity.id)))).scalar()
-
-    # Posts today (by post creation date, not collection date)
-    posts_today = (
-        await session.execute(
-            select(func.count(Post.id)).where(
-                and_(
-                    post_filter,
-                    Post.post_created_at.isnot(None),
-                    Post.post_created_at >= today_start
-                )
-            )
-        )
-    ).scalar()
-
-    # Posts this week (by post creation date, not collection date)
-    posts_this_week = (
-        await session.execute(
-            select(func.count(Post.id)).where(
-                and_(
-                    post_filter,
-                    Post.post_created_at.isnot(None),
-                    Post.post_created_at >= week_start
-                )
-            )
-        )
-    ).scalar()
-
-    # Sentiment breakdown (apply date filter)
-    sentiment_query = (
-        select(Post.sentiment_label, func.count(Post.id))
-        .where(and_(post_filter, Post.sentiment_label.isnot(None)))
-        .group_by(Post.sentiment_label)
+    daily_filter = build_daily_filter(parsed_ids, days)
+
+    # Post counts and sentiment breakdown in a single pass using conditional aggregation.
+    # Today/week use post creation date, not collection date.
+    counts_query = select(
+        sum_posts().label("total_posts"),
+        sum_posts(PostDailyCount.day >= today_start).label("posts_today"),
+        sum_posts(PostDailyCount.day >= week_start).label("posts_this_week"),
+        *(
+            sum_posts(PostDailyCount.sentiment_label == label).label(label)
+            for label in SENTIMENT_LABELS
+        ),
+    ).where(daily_filter)
+
+    # Total listeners and entities
+    totals_query = select(
+        select(func.count()).select_from(Listener).scalar_subquery().label("total_listeners"),
+        select(func.count()).select_from(Entity).scalar_subquery().label("total_entities"),
     )
-    sentiment_result = await session.execute(sentiment_query)
-    sentiment_breakdown = {row[0]: row[1] for row in sentiment_result.all()}
 
     # Platform breakdown (apply date filter)
     platform_query = (
-        select(Post.platform, func.count(Post.id))
-        .where(post_filter)
-        .group_by(Post.platform)
+        select(PostDailyCount.platform, sum_posts().label("count"))
+        .where(daily_filter)
+        .group_by(PostDailyCount.platform)
+    )
+
+    # The queries are independent, so run them concurrently on separate pooled connections
+    counts_rows, totals_rows, platform_rows = await asyncio.gather(
+        fetch_all(counts_query),
+        fetch_all(totals_query),
+        fetch_all(platform_query),
     )
-    platform_result = await session.execute(platform_query)
-    top_platforms = {row[0]: row[1] for row in platform_result.all()}
-
-    return AnalyticsOverview(
-        total_posts=total_posts,
-        total_listeners=total_listeners,
-        total_entities=total_entities,
-        posts_today=posts_today,
-        posts_this_week=posts_this_week,
-        sentiment_breakdown=sentiment_breakdown,
-        top_platforms=top_platforms,
+    counts = counts_rows[0]
+    totals = totals_rows[0]
+
+    return AnalyticsOverview.model_validate(
+        {
+            **counts,
+            **totals,
+            "sentiment_breakdown": {
+                label: counts[label] for label in SENTIMENT_LABELS if counts[label]
+            },
+            "top_platforms": {row["platform"]: row["count"] for row in platform_rows},
+        }
     )
 
 
-@router.get("/sentiment", response_model=list[SentimentBreakdown])
+@router.get(
+    "/sentiment",
+    response_model=list[SentimentBreakdown],
+    dependencies=[Depends(analytics_etag)],
+)
+@cached("analytics")
 async def sentiment_breakdown(
     listener_ids: str | None = Query(None, description="Comma-separated listener IDs"),
     days: int | None = Query(None, ge=1, le=365, description="Filter to last N days"),
@@ -132,89 +174,104 @@ async def sentiment_breakdown(
 ):
     """Get sentiment breakdown with percentages."""
     parsed_ids = parse_listener_ids(listener_ids)
-    listener_filter = build_listener_filter(parsed_ids)
-    date_filter = build_date_filter(days)
-    post_filter = and_(listener_filter, date_filter) if days else listener_filter
+    daily_filter = build_daily_filter(parsed_ids, days)
 
+    # Percentages come from a window over the grouped counts, in the same pass
+    count = sum_posts()
     query = (
-        select(Post.sentiment_label, func.count(Post.id).label("count"))
-        .where(and_(post_filter, Post.sentiment_label.isnot(None)))
-        .group_by(Post.sentiment_label)
+        select(
+            PostDailyCount.sentiment_label,
+            count.label("count"),
+            (count * 100.0 / func.sum(count).over()).label("percentage"),
+        )
+        .where(and_(daily_filter, PostDailyCount.sentiment_label.isnot(None)))
+        .group_by(PostDailyCount.sentiment_label)
     )
     result = await session.execute(query)
-    rows = result.all()
-
-    total = sum(row.count for row in rows)
-    if total == 0:
-        return []
 
     return [
         SentimentBreakdown(
-            label=row.sentiment_label,
-            count=row.count,
-            percentage=round((row.count / total) * 100, 2),
+            label=row["sentiment_label"],
+            count=row["count"],
+            percentage=round(float(row["percentage"]), 2),
         )
-        for row in rows
+        for row in result.mappings()
     ]
 
 
-@router.get("/timeline", response_model=list[TimelinePoint])
+@router.get(
+    "/timeline",
+    response_model=list[TimelinePoint],
+    dependencies=[Depends(analytics_etag)],
+)
+@cached("analytics")
 async def posts_timeline(
     listener_ids: str | None = Query(None, description="Comma-separated listener IDs"),
     days: int | None = Query(None, ge=1, le=365, description="Filter to last N days"),
     session: AsyncSession = Depends(get_session),
 ):
-    """Get posts timeline with sentiment breakdown per day."""
+    """Get posts timeline with sentiment breakdown per day.
+
+    Days are generated with generate_series and posts are joined on a half-open
+    range per day, so the post_created_at index is range-scanned and days
+    without posts are returned with zero counts.
+    """
     parsed_ids = parse_listener_ids(listener_ids)
     listener_filter = build_listener_filter(parsed_ids)
     date_filter = build_date_filter(days)
 
     # Use post_created_at (when post was made) instead of collected_at
-    # Note: Reuse the same expression for select, group_by, and order_by to avoid SQL errors
-    date_col = func.date_trunc("day", Post.post_created_at).label("date")
+    if days:
+        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        series_start = today_start - timedelta(days=days)
+        series_end = today_start
+    else:
+        # No date range - span the days between the first and last post
+        series_start = select(func.date_trunc("day", func.min(Post.post_created_at))).where(
+            listener_filter
+        ).scalar_subquery()
+        series_end = select(func.date_trunc("day", func.max(Post.post_created_at))).where(
+            listener_filter
+        ).scalar_subquery()
+
+    day_series = (
+        func.generate_series(series_start, series_end, timedelta(days=1))
+        .table_valued("day")
+        .render_derived(name="d")
+    )
+    day_col = day_series.c.day
 
-    # Build where clause - always filter out posts without post_created_at
-    where_clause = and_(
+    # Half-open range per day keeps the join predicate sargable
+    join_clause = and_(
+        Post.post_created_at >= day_col,
+        Post.post_created_at < day_col + timedelta(days=1),
         listener_filter,
         date_filter,
-        Post.post_created_at.isnot(None),
     )
 
     query = (
         select(
-            date_col,
+            day_col.label("date"),
             func.count(Post.id).label("count"),
-            func.sum(case((Post.sentiment_label == "positive", 1), else_=0)).label(
-                "sentiment_positive"
-            ),
-            func.sum(case((Post.sentiment_label == "negative", 1), else_=0)).label(
-                "sentiment_negative"
-            ),
-            func.sum(case((Post.sentiment_label == "neutral", 1), else_=0)).label(
-                "sentiment_neutral"
+            *(
+                func.count(Post.id).filter(Post.sentiment_label == label).label(f"sentiment_{label}")
+                for label in SENTIMENT_LABELS
             ),
         )
-        .where(where_clause)
-        .group_by(date_col)
-        .order_by(date_col)
+        .select_from(day_series)
+        .outerjoin(Post, join_clause)
+        .group_by(day_col)
+        .order_by(day_col)
     )
 
     result = await session.execute(query)
-    rows = result.all()
 
-    return [
-        TimelinePoint(
-            date=row.date,
-            count=row.count,
-            sentiment_positive=row.sentiment_positive or 0,
-            sentiment_negative=row.sentiment_negative or 0,
-            sentiment_neutral=row.sentiment_neutral or 0,
-        )
-        for row in rows
-    ]
+    # Column labels match the TimelinePoint fields
+    return [TimelinePoint.model_validate(row) for row in result.mappings()]
 
 
 @router.get("/authors", response_model=list[AuthorStats])
+@cached("analytics")
 async def top_authors(
     listener_ids: str | None = Query(None, description="Comma-separated listener IDs"),
     limit: int = Query(20, ge=1, le=100),
@@ -228,32 +285,24 @@ async def top_authors(
         select(
             Post.author_handle,
             Post.author_display_name,
-            func.count(Post.id).label("post_count"),
-            func.avg(Post.likes_count).label("avg_likes"),
-            func.avg(Post.sentiment_score).label("avg_sentiment"),
+            func.count().label("post_count"),
+            rounded_avg(Post.likes_count, 2).label("avg_likes"),
+            rounded_avg(Post.sentiment_score, 4, default=None).label("avg_sentiment"),
         )
         .where(and_(post_filter, Post.author_handle.isnot(None)))
         .group_by(Post.author_handle, Post.author_display_name)
-        .order_by(func.count(Post.id).desc())
+        .order_by(func.count().desc())
         .limit(limit)
     )
 
     result = await session.execute(query)
-    rows = result.all()
 
-    return [
-        AuthorStats(
-            author_handle=row.author_handle,
-            author_display_name=row.author_display_name,
-            post_count=row.post_count,
-            avg_likes=round(row.avg_likes or 0, 2),
-            avg_sentiment=round(row.avg_sentiment, 4) if row.avg_sentiment else None,
-        )
-        for row in rows
-    ]
+    # Column labels match the AuthorStats fields
+    return [AuthorStats.model_validate(row) for row in result.mappings()]
 
 
 @router.get("/engagement")
+@cached("analytics")
 async def engagement_stats(
     listener_ids: str | None = Query(None, description="Comma-separated listener IDs"),
     days: int | None = Query(None, ge=1, le=365, description="Filter to last N days"),
@@ -269,21 +318,21 @@ async def engagement_stats(
         func.sum(Post.likes_count).label("total_likes"),
         func.sum(Post.replies_count).label("total_replies"),
         func.sum(Post.reposts_count).label("total_reposts"),
-        func.avg(Post.likes_count).label("avg_likes"),
-        func.avg(Post.replies_count).label("avg_replies"),
-        func.avg(Post.reposts_count).label("avg_reposts"),
+        rounded_avg(Post.likes_count, 2).label("avg_likes"),
+        rounded_avg(Post.replies_count, 2).label("avg_replies"),
+        rounded_avg(Post.reposts_count, 2).label("avg_reposts"),
         func.max(Post.likes_count).label("max_likes"),
     ).where(post_filter)
 
     result = await session.execute(query)
-    row = result.one()
+    row = result.mappings().one()
 
     return {
-        "total_likes": row.total_likes or 0,
-        "total_replies": row.total_replies or 0,
-        "total_reposts": row.total_reposts or 0,
-        "avg_likes": round(row.avg_likes or 0, 2),
-        "avg_replies": round(row.avg_replies or 0, 2),
-        "avg_reposts": round(row.avg_reposts or 0, 2),
-        "max_likes": row.max_likes or 0,
+        "total_likes": row["total_likes"] or 0,
+        "total_replies": row["total_replies"] or 0,
+        "total_reposts": row["total_reposts"] or 0,
+        "avg_likes": row["avg_likes"],
+        "avg_replies": row["avg_replies"],
+        "avg_reposts": row["avg_reposts"],
+        "max_likes": row["max_likes"] or 0,
     }
@@ -1,15 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import Integer, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import cache_control, cached, check_etag, dataset_version
 from app.database import get_session
-from app.models import Entity, PostEntity, Post
+from app.models import Entity, EntityOccurrenceCount, PostEntity, Post
 from app.schemas import EntityResponse, EntityTopResponse
 
 router = APIRouter()
 
 
-@router.get("", response_model=list[EntityResponse])
+async def entities_etag(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+):
+    """Answer conditional GETs with 304 while the listener's posts are unchanged."""
+    listener_id = request.query_params.get("listener_id")
+    listener_ids = [int(listener_id)] if listener_id and listener_id.isdigit() else None
+    version = await dataset_version(session, listener_ids)
+    check_etag(request, response, version)
+
+
+@router.get(
+    "",
+    response_model=list[EntityResponse],
+    dependencies=[Depends(entities_etag)],
+)
 async def list_entities(
     entity_type: str | None = None,
     listener_id: int | None = None,
@@ -21,12 +38,15 @@ async def list_entities(
     query = select(Entity).order_by(Entity.created_at.desc())
 
     if listener_id:
-        query = (
-            query.join(PostEntity, Entity.id == PostEntity.entity_id)
+        # Semi-join: stops at the first matching post per entity instead of
+        # joining every mention and de-duplicating with DISTINCT
+        mentioned_by_listener = (
+            select(PostEntity.id)
             .join(Post, PostEntity.post_id == Post.id)
-            .where(Post.listener_id == listener_id)
-            .distinct()
+            .where(PostEntity.entity_id == Entity.id, Post.listener_id == listener_id)
+            .exists()
         )
+        query = query.where(mentioned_by_listener)
 
     if entity_type:
         query = query.where(Entity.entity_type == entity_type)
@@ -38,29 +58,34 @@ async def list_entities(
     return result.scalars().all()
 
 
-@router.get("/top", response_model=list[EntityTopResponse])
+@router.get(
+    "/top",
+    response_model=list[EntityTopResponse],
+    dependencies=[Depends(cache_control), Depends(entities_etag)],
+)
+@cached("entities")
 async def top_entities(
     entity_type: str | None = None,
     listener_id: int | None = None,
     limit: int = Query(20, ge=1, le=500),
     session: AsyncSession = Depends(get_session),
 ):
-    """Get top entities by occurrence count."""
-    query = (
-        select(
-            Entity.id,
-            Entity.entity_type,
-            Entity.entity_text,
-            Entity.display_text,
-            func.count(PostEntity.id).label("occurrence_count"),
-        )
-        .join(PostEntity, Entity.id == PostEntity.entity_id)
-    )
+    """Get top entities by occurrence count.
+
+    Reads the entity_occurrence_counts rollup (refreshed by the collector after
+    each collection) instead of aggregating post_entities on every request.
+    """
+    occurrence_count = func.sum(EntityOccurrenceCount.occurrence_count).cast(Integer)
+    query = select(
+        Entity.id,
+        Entity.entity_type,
+        Entity.entity_text,
+        Entity.display_text,
+        occurrence_count.label("occurrence_count"),
+    ).join(EntityOccurrenceCount, Entity.id == EntityOccurrenceCount.entity_id)
 
     if listener_id:
-        query = query.join(Post, PostEntity.post_id == Post.id).where(
-            Post.listener_id == listener_id
-        )
+        query = query.where(EntityOccurrenceCount.listener_id == listener_id)
 
     # Apply entity_type filter BEFORE group_by
     if entity_type:
@@ -68,37 +93,27 @@ async def top_entities(
 
     query = (
         query.group_by(Entity.id, Entity.entity_type, Entity.entity_text, Entity.display_text)
-        .order_by(func.count(PostEntity.id).desc())
+        .order_by(occurrence_count.desc())
         .limit(limit)
     )
 
     result = await session.execute(query)
-    rows = result.all()
 
-    return [
-        EntityTopResponse(
-            id=row.id,
-            entity_type=row.entity_type,
-            entity_text=row.entity_text,
-            display_text=row.display_text,
-            occurrence_count=row.occurrence_count,
-        )
-        for row in rows
-    ]
+    # Column labels match the EntityTopResponse fields
+    return [EntityTopResponse.model_validate(row) for row in result.mappings()]
 
 
-@router.get("/types")
+@router.get("/types", dependencies=[Depends(cache_control), Depends(entities_etag)])
+@cached("entities")
 async def entity_types(session: AsyncSession = Depends(get_session)):
     """Get all entity types with counts."""
     query = (
-        select(Entity.entity_type, func.count(Entity.id).label("count"))
+        select(Entity.entity_type, func.count().label("count"))
         .group_by(Entity.entity_type)
-        .order_by(func.count(Entity.id).desc())
+        .order_by(func.count().desc())
     )
     result = await session.execute(query)
-    rows = result.all()
-
-    return [{"entity_type": row.entity_type, "count": row.count} for row in rows]
+    return [dict(row) for row in result.mappings()]
 
 
 @router.get("/{entity_id}", response_model=EntityResponse)
@@ -107,8 +122,7 @@ async def get_entity(
     session: AsyncSession = Depends(get_session),
 ):
     """Get a specific entity by ID."""
-    result = await session.execute(select(Entity).where(Entity.id == entity_id))
-    entity = result.scalar_one_or_none()
+    entity = await session.get(Entity, entity_id)
     if not entity:
         raise HTTPException(status_code=404, detail="Entity not found")
     return entity
@@ -121,26 +135,28 @@ async def get_entity_posts(
     session: AsyncSession = Depends(get_session),
 ):
     """Get posts containing a specific entity."""
-    # Check entity exists
-    result = await session.execute(select(Entity).where(Entity.id == entity_id))
-    entity = result.scalar_one_or_none()
-    if not entity:
-        raise HTTPException(status_code=404, detail="Entity not found")
-
-    # Get posts via junction table
+    # Entity and its posts in one round-trip; the outer joins keep the entity
+    # row when it has no posts, so an empty result means it doesn't exist.
+    # The window count is taken before LIMIT, giving the entity's total posts.
     query = (
-        select(Post)
-        .join(PostEntity, Post.id == PostEntity.post_id)
-        .where(PostEntity.entity_id == entity_id)
+        select(Entity, Post, func.count(Post.id).over().label("total"))
+        .outerjoin(PostEntity, PostEntity.entity_id == Entity.id)
+        .outerjoin(Post, Post.id == PostEntity.post_id)
+        .where(Entity.id == entity_id)
         .order_by(Post.collected_at.desc())
         .limit(limit)
     )
 
     result = await session.execute(query)
-    posts = result.scalars().all()
+    rows = result.all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Entity not found")
+
+    entity = rows[0].Entity
+    posts = [row.Post for row in rows if row.Post is not None]
 
     return {
         "entity": EntityResponse.model_validate(entity),
         "posts": posts,
-        "total": len(posts),
+        "total": rows[0].total,
     }
@@ -1,8 +1,13 @@
+import asyncio
+
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import delete, select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
+from app.cache import cached, check_etag, dataset_version, invalidate, listeners_version
 from app.database import get_session
 from app.models import Listener, Post
 from app.schemas import ListenerCreate, ListenerUpdate, ListenerResponse
@@ -13,7 +18,43 @@ router = APIRouter()
 COLLECTOR_URL = "http://collector:8001"
 
 
-@router.get("", response_model=list[ListenerResponse])
+# Validates a whole list of ORM listeners in a single pydantic-core call
+LISTENERS_ADAPTER = TypeAdapter(list[ListenerResponse])
+
+
+def with_post_counts(rows) -> list[ListenerResponse]:
+    """Build listener responses from (Listener, post_count) rows."""
+    rows = list(rows)
+    listeners = LISTENERS_ADAPTER.validate_python(
+        [row.Listener for row in rows], from_attributes=True
+    )
+    for listener, row in zip(listeners, rows):
+        listener.post_count = row.post_count
+    return listeners
+
+
+async def listeners_etag(
+    request: Request,
+    response: Response,
+    is_active: bool | None = None,
+    platform: str | None = None,
+    include_post_count: bool = False,
+    session: AsyncSession = Depends(get_session),
+):
+    """Answer conditional GETs with 304 while the listed listeners are unchanged."""
+    version = await listeners_version(session, is_active, platform)
+    if include_post_count:
+        # Post counts change with every collection
+        version = f"{version}|{await dataset_version(session)}"
+    check_etag(request, response, version)
+
+
+@router.get(
+    "",
+    response_model=list[ListenerResponse],
+    dependencies=[Depends(listeners_etag)],
+)
+@cached("listeners", ttl=30)
 async def list_listeners(
     is_active: bool | None = None,
     platform: str | None = None,
@@ -21,30 +62,29 @@ async def list_listeners(
     session: AsyncSession = Depends(get_session),
 ):
     """List all listeners with optional filters."""
-    query = select(Listener).order_by(Listener.created_at.desc())
+    # Responses only use columns - fail loudly instead of lazy loading relationships
+    query = select(Listener).options(raiseload("*")).order_by(Listener.created_at.desc())
 
     if is_active is not None:
         query = query.where(Listener.is_active == is_active)
     if platform:
         query = query.where(Listener.platform == platform)
 
-    result = await session.execute(query)
-    listeners = result.scalars().all()
-
     if include_post_count:
-        # Get post counts for each listener
-        response = []
-        for listener in listeners:
-            count_result = await session.execute(
-                select(func.count(Post.id)).where(Post.listener_id == listener.id)
-            )
-            post_count = count_result.scalar()
-            listener_dict = ListenerResponse.model_validate(listener).model_dump()
-            listener_dict["post_count"] = post_count
-            response.append(listener_dict)
-        return response
+        # Count every listener's posts in the same query with one GROUP BY
+        query = (
+            query.add_columns(func.count(Post.id).label("post_count"))
+            .outerjoin(Post, Post.listener_id == Listener.id)
+            .group_by(Listener.id)
+        )
+        result = await session.execute(query)
+        return with_post_counts(result)
 
-    return listeners
+    result = await session.execute(query)
+
+    # Cache the validated models: FastAPI passes model instances through
+    # instead of re-reading every ORM attribute on each cache hit
+    return LISTENERS_ADAPTER.validate_python(result.scalars().all(), from_attributes=True)
 
 
 @router.post("", response_model=ListenerResponse)
@@ -57,6 +97,7 @@ async def create_listener(
     session.add(db_listener)
     await session.commit()
     await session.refresh(db_listener)
+    invalidate("listeners", "analytics", "entities")
     return db_listener
 
 
@@ -67,20 +108,42 @@ async def get_listener(
     session: AsyncSession = Depends(get_session),
 ):
     """Get a specific listener by ID."""
-    result = await session.execute(select(Listener).where(Listener.id == listener_id))
-    listener = result.scalar_one_or_none()
-    if not listener:
+    if not include_post_count:
+        # Primary key lookup through the identity map
+        listener = await session.get(Listener, listener_id, options=[raiseload("*")])
+        if not listener:
+            raise HTTPException(status_code=404, detail="Listener not found")
+        return listener
+
+    query = (
+        select(Listener)
+        .options(raiseload("*"))
+        .where(Listener.id == listener_id)
+        .add_columns(func.count(Post.id).label("post_count"))
+        .outerjoin(Post, Post.listener_id == Listener.id)
+        .group_by(Listener.id)
+    )
+    result = await session.execute(query)
+    row = result.one_or_none()
+    if not row:
         raise HTTPException(status_code=404, detail="Listener not found")
 
-    if include_post_count:
-        count_result = await session.execute(
-            select(func.count(Post.id)).where(Post.listener_id == listener.id)
-        )
-        post_count = count_result.scalar()
-        listener_dict = ListenerResponse.model_validate(listener).model_dump()
-        listener_dict["post_count"] = post_count
-        return listener_dict
+    return with_post_counts([row])[0]
+
 
+async def update_listener_row(session: AsyncSession, listener_id: int, **values) -> Listener:
+    """UPDATE a listener and return it via RETURNING, raising 404 if it doesn't exist."""
+    result = await session.execute(
+        update(Listener)
+        .where(Listener.id == listener_id)
+        .values(**values)
+        .returning(Listener)
+        .execution_options(synchronize_session=False)
+    )
+    listener = result.scalar_one_or_none()
+    if not listener:
+        raise HTTPException(status_code=404, detail="Listener not found")
+    await session.commit()
     return listener
 
 
@@ -91,17 +154,16 @@ async def update_listener(
     session: AsyncSession = Depends(get_session),
 ):
     """Update a listener."""
-    result = await session.execute(select(Listener).where(Listener.id == listener_id))
-    listener = result.scalar_one_or_none()
-    if not listener:
-        raise HTTPException(status_code=404, detail="Listener not found")
-
     update_data = update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(listener, field, value)
-
-    await session.commit()
-    await session.refresh(listener)
+    if not update_data:
+        # Nothing to change - just return the listener
+        listener = await session.get(Listener, listener_id)
+        if not listener:
+            raise HTTPException(status_code=404, detail="Listener not found")
+        return listener
+
+    listener = await update_listener_row(session, listener_id, **update_data)
+    invalidate("listeners", "analytics", "entities")
     return listener
 
 
@@ -110,14 +172,15 @@ async def delete_listener(
     listener_id: int,
     session: AsyncSession = Depends(get_session),
 ):
-    """Delete a listener and all its posts."""
-    result = await session.execute(select(Listener).where(Listener.id == listener_id))
-    listener = result.scalar_one_or_none()
-    if not listener:
+    """Delete a listener and all its posts (removed by the ON DELETE CASCADE foreign keys)."""
+    result = await session.execute(
+        delete(Listener).where(Listener.id == listener_id).returning(Listener.id)
+    )
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Listener not found")
 
-    await session.delete(listener)
     await session.commit()
+    invalidate("listeners", "posts", "post_entities", "analytics", "entities")
     return {"status": "deleted", "id": listener_id}
 
 
@@ -127,14 +190,8 @@ async def toggle_listener(
     session: AsyncSession = Depends(get_session),
 ):
     """Toggle a listener's active status."""
-    result = await session.execute(select(Listener).where(Listener.id == listener_id))
-    listener = result.scalar_one_or_none()
-    if not listener:
-        raise HTTPException(status_code=404, detail="Listener not found")
-
-    listener.is_active = not listener.is_active
-    await session.commit()
-    await session.refresh(listener)
+    listener = await update_listener_row(session, listener_id, is_active=~Listener.is_active)
+    invalidate("listeners")
     return listener
 
 
@@ -144,41 +201,47 @@ async def acknowledge_new_content(
     session: AsyncSession = Depends(get_session),
 ):
     """Acknowledge new content (clear the has_new_content flag)."""
-    result = await session.execute(select(Listener).where(Listener.id == listener_id))
-    listener = result.scalar_one_or_none()
-    if not listener:
-        raise HTTPException(status_code=404, detail="Listener not found")
-
-    listener.has_new_content = False
-    await session.commit()
-    await session.refresh(listener)
+    listener = await update_listener_row(session, listener_id, has_new_content=False)
+    invalidate("listeners")
     return listener
 
 
 @router.post("/{listener_id}/collect")
 async def trigger_collection(
     listener_id: int,
+    request: Request,
     session: AsyncSession = Depends(get_session),
 ):
     """Trigger collection for a specific listener."""
-    # Verify listener exists
-    result = await session.execute(select(Listener).where(Listener.id == listener_id))
-    listener = result.scalar_one_or_none()
-    if not listener:
+    # Verify listener exists - only its active flag is needed
+    result = await session.execute(select(Listener.is_active).where(Listener.id == listener_id))
+    is_active = result.scalar_one_or_none()
+    if is_active is None:
         raise HTTPException(status_code=404, detail="Listener not found")
 
-    if not listener.is_active:
+    if not is_active:
         raise HTTPException(status_code=400, detail="Listener is not active")
 
-    # Call collector service
-    try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{COLLECTOR_URL}/collect/bluesky",
+    # Call collector service. Concurrent triggers for the same listener share
+    # one in-flight call; shield it so a disconnecting client doesn't cancel
+    # the call for the others.
+    inflight = request.app.state.inflight
+    task = inflight.get(listener_id)
+    if task is None:
+        task = asyncio.create_task(
+            request.app.state.http.post(
+                "/collect/bluesky",
                 json={"listener_id": listener_id},
             )
-            response.raise_for_status()
-            return response.json()
+        )
+        inflight[listener_id] = task
+        task.add_done_callback(lambda _: inflight.pop(listener_id, None))
+
+    try:
+        response = await asyncio.shield(task)
+        response.raise_for_status()
+        invalidate("listeners", "posts", "analytics", "entities")
+        return response.json()
     except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="Collection timed out")
     except httpx.HTTPStatusError as e:
@@ -1,14 +1,19 @@
+import asyncio
+import contextlib
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import StreamingResponse
-from sqlalchemy import select, func, and_
+import orjson
+from sqlalchemy import Text, cast, delete, select, func, and_, or_, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-import csv
-import io
+from sqlalchemy.orm import raiseload
+import base64
+import binascii
 import json
 
-from app.database import get_session
+from app.cache import cached, check_etag, invalidate, post_version
+from app.database import async_session, get_session
 from app.models import Post, Entity, PostEntity
 from app.schemas import PostResponse, PaginatedResponse
 
@@ -39,7 +44,62 @@ def build_post_filters(
     return filters
 
 
-@router.get("", response_model=PaginatedResponse[PostResponse])
+def encode_cursor(post: Post) -> str:
+    """Encode the sort key of the last post on a page as an opaque cursor."""
+    key = {
+        "post_created_at": post.post_created_at.isoformat() if post.post_created_at else None,
+        "id": post.id,
+    }
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, int]:
+    """Decode a cursor produced by encode_cursor, raising 400 if it is malformed."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = key["post_created_at"]
+        return (datetime.fromisoformat(created_at) if created_at else None, int(key["id"]))
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def build_cursor_filter(cursor: str):
+    """
+    Keyset filter for rows after the cursor in
+    ORDER BY post_created_at DESC NULLS LAST, id DESC.
+    """
+    created_at, post_id = decode_cursor(cursor)
+    if created_at is None:
+        # Already in the NULLS LAST tail
+        return and_(Post.post_created_at.is_(None), Post.id < post_id)
+    return or_(
+        tuple_(Post.post_created_at, Post.id) < tuple_(created_at, post_id),
+        Post.post_created_at.is_(None),
+    )
+
+
+async def posts_etag(
+    request: Request,
+    response: Response,
+    listener_id: int | None = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Answer conditional GETs with 304 while the listener's posts are unchanged.
+
+    The post version also moves when existing posts are updated, such as
+    engagement counters refreshed by a collection or NLP results stored.
+    """
+    version = await post_version(session, [listener_id] if listener_id else None)
+    check_etag(request, response, version)
+
+
+@router.get(
+    "",
+    response_model=PaginatedResponse[PostResponse],
+    dependencies=[Depends(posts_etag)],
+)
+@cached("posts", ttl=15)
 async def list_posts(
     listener_id: int | None = None,
     platform: str | None = None,
@@ -48,27 +108,58 @@ async def list_posts(
     days: int | None = Query(None, ge=1, le=365, description="Filter to last N days"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="Cursor from a previous response's next_cursor"),
     session: AsyncSession = Depends(get_session),
 ):
-    """List posts with filtering and pagination."""
-    # Order by post creation date (when post was made), not when we collected it
-    query = select(Post).order_by(Post.post_created_at.desc().nullslast())
+    """List posts with filtering and pagination.
+
+    Pass `cursor` (the `next_cursor` of the previous response) for keyset
+    pagination, which skips the total count and stays fast on deep pages.
+    Without it, `page` selects a page by offset.
+    """
+    # Order by post creation date (when post was made), not when we collected it.
+    # id breaks ties so the order is stable across pages.
+    # Responses only use columns - fail loudly instead of lazy loading relationships
+    query = (
+        select(Post)
+        .options(raiseload("*"))
+        .order_by(Post.post_created_at.desc().nullslast(), Post.id.desc())
+    )
 
     # Apply filters
     filters = build_post_filters(listener_id, platform, sentiment_label, author_handle, days)
     for f in filters:
         query = query.where(f)
 
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await session.execute(count_query)).scalar()
+    if cursor:
+        # Fetch one extra row to know whether there is a next page
+        query = query.where(build_cursor_filter(cursor)).limit(page_size + 1)
+        result = await session.execute(query)
+        posts = result.scalars().all()
+        has_more = len(posts) > page_size
+        posts = posts[:page_size]
+
+        return PaginatedResponse(
+            items=posts,
+            page_size=page_size,
+            next_cursor=encode_cursor(posts[-1]) if has_more else None,
+        )
 
-    # Apply pagination
+    # The total comes from a window count over the filtered rows (computed
+    # before OFFSET/LIMIT), so the page and its total need one round-trip
     offset = (page - 1) * page_size
-    query = query.offset(offset).limit(page_size)
+    query = query.add_columns(func.count().over().label("total")).offset(offset).limit(page_size)
 
     result = await session.execute(query)
-    posts = result.scalars().all()
+    rows = result.all()
+    posts = [row.Post for row in rows]
+    if rows:
+        total = rows[0].total
+    else:
+        # Past the last page there are no rows to carry the total
+        count_query = select(func.count()).select_from(Post).where(*filters)
+        total = (await session.execute(count_query)).scalar()
+    has_more = offset + len(posts) < total
 
     return PaginatedResponse(
         items=posts,
@@ -76,9 +167,92 @@ async def list_posts(
         page=page,
         page_size=page_size,
         pages=(total + page_size - 1) // page_size,
+        next_cursor=encode_cursor(posts[-1]) if posts and has_more else None,
     )
 
 
+# Rows fetched per round-trip and bytes buffered per chunk when streaming exports
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def build_export_query(
+    listener_id: int | None,
+    platform: str | None,
+    sentiment_label: str | None,
+    author_handle: str | None,
+    days: int | None,
+):
+    """Build the filtered, ordered posts query shared by the exports."""
+    query = select(Post).options(raiseload("*")).order_by(Post.post_created_at.desc().nullslast())
+
+    filters = build_post_filters(listener_id, platform, sentiment_label, author_handle, days)
+    for f in filters:
+        query = query.where(f)
+    return query
+
+
+async def stream_posts(query):
+    """
+    Yield posts from a server-side cursor, EXPORT_BATCH_SIZE rows at a time.
+
+    Opens its own session: request-scoped dependencies are closed before a
+    StreamingResponse body is sent.
+    """
+    async with async_session() as session:
+        result = await session.stream_scalars(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for post in result:
+            yield post
+
+
+def iso_timestamp(column):
+    """Render a timestamp as ISO 8601 text ('T' separator) in SQL."""
+    return func.replace(cast(column, Text), " ", "T")
+
+
+async def copy_csv(query):
+    """
+    Stream the rows of `query` as CSV (with a header row) generated by
+    Postgres COPY, so rows never become Python objects.
+
+    Like stream_posts, opens its own session for the lifetime of the response.
+    """
+    chunks: asyncio.Queue = asyncio.Queue(maxsize=16)
+
+    async with async_session() as session:
+        conn = await session.connection()
+        raw_connection = await conn.get_raw_connection()
+        compiled = query.compile(dialect=conn.dialect)
+        args = [compiled.params[name] for name in compiled.positiontup]
+
+        async def copy():
+            try:
+                await raw_connection.driver_connection.copy_from_query(
+                    str(compiled), *args, output=chunks.put, format="csv", header=True
+                )
+            except asyncio.CancelledError:
+                # Only the reader cancels the copy, once it has stopped reading:
+                # waiting for room in the queue would never end
+                raise
+            except Exception:
+                # The reader re-raises the error at `await task` after the marker
+                await chunks.put(None)
+                raise
+            await chunks.put(None)
+
+        task = asyncio.create_task(copy())
+        try:
+            while (chunk := await chunks.get()) is not None:
+                yield chunk
+            # Re-raise COPY errors
+            await task
+        finally:
+            # The COPY owns the connection: stop it before the session closes
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+
 @router.get("/export/csv")
 async def export_posts_csv(
     listener_id: int | None = None,
@@ -86,55 +260,31 @@ async def export_posts_csv(
     sentiment_label: str | None = None,
     author_handle: str | None = None,
     days: int | None = Query(None, ge=1, le=365, description="Filter to last N days"),
-    session: AsyncSession = Depends(get_session),
 ):
-    """Export posts as CSV file."""
-    query = select(Post).order_by(Post.post_created_at.desc().nullslast())
-
-    filters = build_post_filters(listener_id, platform, sentiment_label, author_handle, days)
-    for f in filters:
-        query = query.where(f)
-
-    result = await session.execute(query)
-    posts = result.scalars().all()
-
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    # Header row
-    writer.writerow([
-        "id", "platform", "author_handle", "author_display_name", "content",
-        "post_url", "likes_count", "replies_count", "reposts_count",
-        "sentiment_label", "sentiment_score", "post_created_at", "collected_at"
-    ])
-
-    # Data rows
-    for post in posts:
-        writer.writerow([
-            post.id,
-            post.platform,
-            post.author_handle,
-            post.author_display_name,
-            post.content,
-            post.post_url,
-            post.likes_count,
-            post.replies_count,
-            post.reposts_count,
-            post.sentiment_label,
-            post.sentiment_score,
-            post.post_created_at.isoformat() if post.post_created_at else "",
-            post.collected_at.isoformat() if post.collected_at else "",
-        ])
-
-    output.seek(0)
+    """Export posts as CSV file, encoded by Postgres with COPY ... TO STDOUT."""
+    query = build_export_query(listener_id, platform, sentiment_label, author_handle, days)
+    query = query.with_only_columns(
+        Post.id,
+        Post.platform,
+        Post.author_handle,
+        Post.author_display_name,
+        Post.content,
+        Post.post_url,
+        Post.likes_count,
+        Post.replies_count,
+        Post.reposts_count,
+        Post.sentiment_label,
+        Post.sentiment_score,
+        iso_timestamp(Post.post_created_at).label("post_created_at"),
+        iso_timestamp(Post.collected_at).label("collected_at"),
+    )
 
     # Generate filename with timestamp
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
     filename = f"posts_export_{timestamp}.csv"
 
     return StreamingResponse(
-        iter([output.getvalue()]),
+        copy_csv(query),
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
@@ -147,47 +297,51 @@ async def export_posts_json(
     sentiment_label: str | None = None,
     author_handle: str | None = None,
     days: int | None = Query(None, ge=1, le=365, description="Filter to last N days"),
-    session: AsyncSession = Depends(get_session),
 ):
-    """Export posts as JSON file."""
-    query = select(Post).order_by(Post.post_created_at.desc().nullslast())
-
-    filters = build_post_filters(listener_id, platform, sentiment_label, author_handle, days)
-    for f in filters:
-        query = query.where(f)
-
-    result = await session.execute(query)
-    posts = result.scalars().all()
-
-    # Build JSON data
-    data = []
-    for post in posts:
-        data.append({
-            "id": post.id,
-            "platform": post.platform,
-            "author_handle": post.author_handle,
-            "author_display_name": post.author_display_name,
-            "content": post.content,
-            "post_url": post.post_url,
-            "likes_count": post.likes_count,
-            "replies_count": post.replies_count,
-            "reposts_count": post.reposts_count,
-            "quotes_count": post.quotes_count,
-            "views_count": post.views_count,
-            "sentiment_label": post.sentiment_label,
-            "sentiment_score": post.sentiment_score,
-            "post_created_at": post.post_created_at.isoformat() if post.post_created_at else None,
-            "collected_at": post.collected_at.isoformat() if post.collected_at else None,
-        })
+    """Export posts as JSON file (an array with one post object per line)."""
+    query = build_export_query(listener_id, platform, sentiment_label, author_handle, days)
+
+    async def generate():
+        chunk = [b"["]
+        size = 0
+        separator = b"\n  "
+        async for post in stream_posts(query):
+            # orjson encodes datetimes natively (ISO 8601) and emits UTF-8 bytes
+            item = orjson.dumps({
+                "id": post.id,
+                "platform": post.platform,
+                "author_handle": post.author_handle,
+                "author_display_name": post.author_display_name,
+                "content": post.content,
+                "post_url": post.post_url,
+                "likes_count": post.likes_count,
+                "replies_count": post.replies_count,
+                "reposts_count": post.reposts_count,
+                "quotes_count": post.quotes_count,
+                "views_count": post.views_count,
+                "sentiment_label": post.sentiment_label,
+                "sentiment_score": post.sentiment_score,
+                "post_created_at": post.post_created_at,
+                "collected_at": post.collected_at,
+            })
+            chunk.append(separator)
+            chunk.append(item)
+            separator = b",\n  "
+            size += len(item)
+            if size >= EXPORT_CHUNK_SIZE:
+                yield b"".join(chunk)
+                chunk = []
+                size = 0
+
+        chunk.append(b"\n]\n")
+        yield b"".join(chunk)
 
     # Generate filename with timestamp
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
     filename = f"posts_export_{timestamp}.json"
 
-    json_output = json.dumps(data, indent=2, ensure_ascii=False)
-
     return StreamingResponse(
-        iter([json_output]),
+        generate(),
         media_type="application/json",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
@@ -199,8 +353,7 @@ async def get_post(
     session: AsyncSession = Depends(get_session),
 ):
     """Get a specific post by ID."""
-    result = await session.execute(select(Post).where(Post.id == post_id))
-    post = result.scalar_one_or_none()
+    post = await session.get(Post, post_id, options=[raiseload("*")])
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     return post
@@ -211,28 +364,39 @@ async def delete_post(
     post_id: int,
     session: AsyncSession = Depends(get_session),
 ):
-    """Delete a specific post."""
-    result = await session.execute(select(Post).where(Post.id == post_id))
-    post = result.scalar_one_or_none()
-    if not post:
+    """Delete a specific post (its entity links go with it via ON DELETE CASCADE)."""
+    result = await session.execute(delete(Post).where(Post.id == post_id).returning(Post.id))
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    await session.delete(post)
     await session.commit()
+    invalidate("posts", "post_entities", "analytics", "entities")
     return {"status": "deleted", "id": post_id}
 
 
-@router.get("/{post_id}/entities")
+async def post_entities_etag(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Answer conditional GETs with 304 while no posts have changed.
+
+    The collector's NLP worker stores a post's entities in the same transaction
+    that sets its nlp_processed_at, which moves the post version.
+    """
+    check_etag(request, response, await post_version(session))
+
+
+@router.get("/{post_id}/entities", dependencies=[Depends(post_entities_etag)])
+@cached("post_entities", ttl=300)
 async def get_post_entities(
     post_id: int,
     session: AsyncSession = Depends(get_session),
 ):
     """Get entities for a specific post."""
-    result = await session.execute(select(Post).where(Post.id == post_id))
-    post = result.scalar_one_or_none()
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-
+    # Outer joins from the post keep one row when it has no entities,
+    # so an empty result means the post doesn't exist
     query = (
         select(
             PostEntity.id,
@@ -244,23 +408,15 @@ async def get_post_entities(
             Entity.entity_text,
             Entity.display_text,
         )
-        .join(Entity, PostEntity.entity_id == Entity.id)
-        .where(PostEntity.post_id == post_id)
+        .select_from(Post)
+        .outerjoin(PostEntity, PostEntity.post_id == Post.id)
+        .outerjoin(Entity, PostEntity.entity_id == Entity.id)
+        .where(Post.id == post_id)
     )
 
     result = await session.execute(query)
-    rows = result.all()
+    rows = result.mappings().all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Post not found")
 
-    return [
-        {
-            "id": row.id,
-            "entity_id": row.entity_id,
-            "entity_type": row.entity_type,
-            "entity_text": row.entity_text,
-            "display_text": row.display_text,
-            "confidence": row.confidence,
-            "start_pos": row.start_pos,
-            "end_pos": row.end_pos,
-        }
-        for row in rows
-    ]
+    return [dict(row) for row in rows if row["id"] is not None]
@@ -1,52 +1,129 @@
 """
 Template view routes for the frontend UI.
+
+Most page shells are identical for every user (data is fetched client-side
+from the API), so they are rendered once at startup and served as files.
+The dashboard is rendered per request with its first screen of data embedded.
 """
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse
 from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.database import get_session
+from app.routes.analytics import (
+    analytics_overview,
+    engagement_stats,
+    posts_timeline,
+    sentiment_breakdown,
+)
+from app.routes.listeners import list_listeners
 
 router = APIRouter()
 
 # Templates directory
 BASE_DIR = Path(__file__).resolve().parent.parent
-templates = Jinja2Templates(directory=BASE_DIR / "templates")
+
+# Compiled templates are cached on disk so restarted workers skip parsing
+TEMPLATE_CACHE_DIR = Path("/tmp/jinja_cache")
+TEMPLATE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+templates = Jinja2Templates(
+    env=Environment(
+        loader=FileSystemLoader(BASE_DIR / "templates"),
+        autoescape=True,
+        bytecode_cache=FileSystemBytecodeCache(str(TEMPLATE_CACHE_DIR)),
+        # Templates only change on deploy, so skip the per-render mtime check
+        auto_reload=settings.debug,
+    )
+)
+
+# Pre-rendered page shells
+RENDERED_DIR = BASE_DIR / "static" / "_rendered"
+
+# Days filter selected by default on the dashboard
+DASHBOARD_DEFAULT_DAYS = 30
+
+# Page template -> page title (the dashboard is rendered per request)
+PAGES = {
+    "listeners.html": "Listeners",
+    "posts.html": "Posts",
+    "entities.html": "Entities",
+}
+
+
+def precompile_templates() -> None:
+    """Compile every template up front (and into the bytecode cache)."""
+    for name in templates.env.list_templates(extensions=["html"]):
+        templates.env.get_template(name)
+
+
+def render_pages() -> None:
+    """Render every page template to RENDERED_DIR."""
+    RENDERED_DIR.mkdir(parents=True, exist_ok=True)
+    for name, page_title in PAGES.items():
+        html = templates.get_template(f"pages/{name}").render(
+            page_title=page_title,
+            # Cache-busting query param for static assets
+            asset_version=settings.api_version,
+        )
+        (RENDERED_DIR / name).write_text(html, encoding="utf-8")
+
+
+def page_response(name: str) -> FileResponse:
+    """Serve a pre-rendered page shell."""
+    return FileResponse(RENDERED_DIR / name, media_type="text/html")
+
+
+async def dashboard_initial_state(session: AsyncSession) -> dict:
+    """
+    Data for the dashboard's default filters (all listeners, last
+    DASHBOARD_DEFAULT_DAYS days). Goes through the cached analytics endpoints.
+    """
+    days = DASHBOARD_DEFAULT_DAYS
+    listeners = await list_listeners(is_active=None, platform=None, include_post_count=False, session=session)
+    return jsonable_encoder({
+        "days": days,
+        "listeners": listeners,
+        "overview": await analytics_overview(listener_ids=None, days=days),
+        "sentiment": await sentiment_breakdown(listener_ids=None, days=days, session=session),
+        "timeline": await posts_timeline(listener_ids=None, days=days, session=session),
+        "engagement": await engagement_stats(listener_ids=None, days=days, session=session),
+    })
 
 
 @router.get("/")
 async def dashboard(request: Request, session: AsyncSession = Depends(get_session)):
-    """Main dashboard page."""
+    """Main dashboard page, with its initial data embedded so the first paint needs no XHR."""
     return templates.TemplateResponse(
         "pages/dashboard.html",
-        {"request": request, "page_title": "Dashboard"},
+        {
+            "request": request,
+            "page_title": "Dashboard",
+            "asset_version": settings.api_version,
+            "initial_state": await dashboard_initial_state(session),
+        },
     )
 
 
 @router.get("/listeners")
-async def listeners_page(request: Request, session: AsyncSession = Depends(get_session)):
+async def listeners_page():
     """Listeners management page."""
-    return templates.TemplateResponse(
-        "pages/listeners.html",
-        {"request": request, "page_title": "Listeners"},
-    )
+    return page_response("listeners.html")
 
 
 @router.get("/posts")
-async def posts_page(request: Request, session: AsyncSession = Depends(get_session)):
+async def posts_page():
     """Posts browser page."""
-    return templates.TemplateResponse(
-        "pages/posts.html",
-        {"request": request, "page_title": "Posts"},
-    )
+    return page_response("posts.html")
 
 
 @router.get("/entities")
-async def entities_page(request: Request, session: AsyncSession = Depends(get_session)):
+async def entities_page():
     """Entities explorer page."""
-    return templates.TemplateResponse(
-        "pages/entities.html",
-        {"request": request, "page_title": "Entities"},
-    )
+    return page_response("entities.html")
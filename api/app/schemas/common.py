@@ -1,13 +1,24 @@
 from typing import Generic, TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, model_serializer
 
 T = TypeVar("T")
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
     items: list[T]
-    total: int
-    page: int
+    # total/page/pages are only known for page-number requests, not cursor requests
+    total: int | None = None
+    page: int | None = None
     page_size: int
-    pages: int
+    pages: int | None = None
+    next_cursor: str | None = None
+
+    @model_serializer(mode="wrap")
+    def _omit_page_counts(self, handler):
+        """Leave total/page/pages out of cursor responses instead of sending nulls."""
+        data = handler(self)
+        for field in ("total", "page", "pages"):
+            if data.get(field) is None:
+                data.pop(field, None)
+        return data
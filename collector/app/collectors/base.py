@@ -1,17 +1,38 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Listener
 
 
+@dataclass(slots=True)
+class ListenerTarget:
+    """The listener columns a collection needs, loaded without ORM instances."""
+
+    id: int
+    name: str
+    rule_type: str
+    rule_value: str
+    initial_scrape_completed: bool
+
+    # Columns to select for ListenerTarget(**row._mapping)
+    columns = (
+        Listener.id,
+        Listener.name,
+        Listener.rule_type,
+        Listener.rule_value,
+        Listener.initial_scrape_completed,
+    )
+
+
 class BaseCollector(ABC):
     """Abstract base class for platform collectors."""
 
     platform: str = "unknown"
 
     @abstractmethod
-    async def collect(self, listener: Listener, session: AsyncSession) -> int:
+    async def collect(self, listener: ListenerTarget, session: AsyncSession) -> int:
         """
         Collect posts for a given listener.
 
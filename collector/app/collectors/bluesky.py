@@ -1,15 +1,18 @@
+import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
+from operator import attrgetter
+from pathlib import Path
 
-from atproto import Client
-from sqlalchemy import select
+from atproto import AsyncClient, Session, SessionEvent
+from cachetools import TTLCache
+from sqlalchemy import literal_column, tuple_, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.collectors.base import BaseCollector
+from app.collectors.base import BaseCollector, ListenerTarget
 from app.config import settings
 from app.models import Listener, Post
-from app.nlp.processor import nlp_processor
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +21,40 @@ INITIAL_SCRAPE_MAX_POSTS = 500  # Max posts to fetch on first scrape (uses pagin
 REGULAR_SCRAPE_LIMIT = 100      # Posts per regular scrape (no pagination, API max is 100)
 PAGE_SIZE = 100                  # Posts per page when paginating
 
+# Rows upserted (and committed) together when collecting several listeners
+SAVE_BATCH_ROWS = 5000
+
+# Post view fields read for every collected post, fetched in one call each
+_post_view_fields = attrgetter("uri", "author", "record", "like_count", "reply_count", "repost_count")
+_author_fields = attrgetter("handle", "display_name", "avatar")
+
+# Counters refreshed when an already-collected post is seen again
+ENGAGEMENT_METRICS = ("likes_count", "replies_count", "reposts_count", "quotes_count")
+
+
+
+def _build_post_upsert():
+    """
+    Build the page upsert once, so SQLAlchemy's compiled cache and asyncpg's
+    prepared statements are reused instead of compiling a VALUES list per page.
+
+    On conflict, update engagement metrics - only where they changed, so
+    re-seen posts with the same counts aren't rewritten (no dead tuples).
+    RETURNING loads the posts straight into the session; xmax is 0 only for
+    rows this statement inserted.
+    """
+    stmt = insert(Post)
+    return stmt.on_conflict_do_update(
+        constraint="uq_platform_post",
+        set_={metric: stmt.excluded[metric] for metric in ENGAGEMENT_METRICS},
+        where=tuple_(*(Post.__table__.c[metric] for metric in ENGAGEMENT_METRICS)).is_distinct_from(
+            tuple_(*(stmt.excluded[metric] for metric in ENGAGEMENT_METRICS))
+        ),
+    ).returning(Post, literal_column("xmax = 0").label("inserted"))
+
+
+POST_UPSERT = _build_post_upsert()
+
 
 class BlueskyCollector(BaseCollector):
     """Collector for Bluesky posts using the AT Protocol."""
@@ -25,15 +62,83 @@ class BlueskyCollector(BaseCollector):
     platform = "bluesky"
 
     def __init__(self):
-        self._client: Client | None = None
+        self._client: AsyncClient | None = None
+        self._login_lock = asyncio.Lock()
+        # Search responses by (query, limit, cursor), reused within the TTL
+        self._search_cache = TTLCache(maxsize=256, ttl=settings.bluesky_search_cache_ttl)
+        self._inflight: dict[tuple, asyncio.Task] = {}
+
+    async def _get_client(self) -> AsyncClient:
+        """
+        Get or create an authenticated Bluesky client.
 
-    def _get_client(self) -> Client:
-        """Get or create an authenticated Bluesky client."""
+        The async client keeps the event loop free during API calls (so
+        listeners are collected concurrently) and refreshes its session token.
+        """
         if self._client is None:
-            self._client = Client()
-            self._client.login(settings.bluesky_handle, settings.bluesky_app_password)
+            # Concurrent listeners share a single login
+            async with self._login_lock:
+                if self._client is None:
+                    client = AsyncClient()
+                    client.on_session_change(self._save_session)
+                    await self._login(client)
+                    self._client = client
         return self._client
 
+    async def _login(self, client: AsyncClient) -> None:
+        """
+        Log in, resuming the session saved by a previous process when there is one.
+
+        Resuming skips createSession, which Bluesky rate-limits per account.
+        """
+        session_file = Path(settings.bluesky_session_file)
+        if session_file.exists():
+            try:
+                await client.login(session_string=session_file.read_text())
+                return
+            except Exception as e:
+                logger.warning("Saved Bluesky session not accepted, logging in again: %s", e)
+
+        await client.login(settings.bluesky_handle, settings.bluesky_app_password)
+
+    async def _save_session(self, event: SessionEvent, session: Session) -> None:
+        """Save new and refreshed sessions so the next process can resume them."""
+        if event not in (SessionEvent.CREATE, SessionEvent.REFRESH):
+            return
+        session_file = Path(settings.bluesky_session_file)
+        try:
+            # Holds tokens - created readable by this user only
+            session_file.touch(mode=0o600, exist_ok=True)
+            session_file.write_text(session.encode())
+        except OSError as e:
+            logger.warning("Could not save Bluesky session: %s", e)
+
+    async def _search_posts(self, client: AsyncClient, params: dict, use_cache: bool):
+        """
+        Search posts, reusing a response fetched within the cache TTL when `use_cache` is set.
+
+        Only regular scrapes use the cache; paginated initial scrapes always
+        walk fresh cursors.
+        """
+        key = (params["q"], params["limit"], params.get("cursor"))
+        if use_cache:
+            response = self._search_cache.get(key)
+            if response is not None:
+                logger.debug("Using cached search response for: %s", params["q"])
+                return response
+
+        # Identical searches running at the same time (listeners with
+        # overlapping rules) share one in-flight request
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(client.app.bsky.feed.search_posts(params=params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        response = await asyncio.shield(task)
+        self._search_cache[key] = response
+        return response
+
     async def is_configured(self) -> bool:
         """Check if Bluesky credentials are configured."""
         return bool(settings.bluesky_handle and settings.bluesky_app_password)
@@ -41,16 +146,16 @@ class BlueskyCollector(BaseCollector):
     async def test_connection(self) -> bool:
         """Test connection to Bluesky API."""
         try:
-            client = self._get_client()
+            client = await self._get_client()
             # Try to get our own profile as a connection test
-            profile = client.get_profile(settings.bluesky_handle)
-            logger.info(f"Connected as: {profile.display_name} (@{profile.handle})")
+            profile = await client.get_profile(settings.bluesky_handle)
+            logger.info("Connected as: %s (@%s)", profile.display_name, profile.handle)
             return True
         except Exception as e:
-            logger.error(f"Bluesky connection test failed: {e}")
+            logger.error("Bluesky connection test failed: %s", e)
             return False
 
-    async def collect(self, listener: Listener, session: AsyncSession) -> int:
+    async def collect(self, listener: ListenerTarget, session: AsyncSession) -> int:
         """
         Collect posts matching the listener's rule.
 
@@ -65,250 +170,239 @@ class BlueskyCollector(BaseCollector):
             logger.warning("Bluesky not configured, skipping collection")
             return 0
 
-        client = self._get_client()
-        posts_collected = 0
-
         try:
-            if listener.rule_type == "keyword":
-                posts_collected = await self._collect_keyword(client, listener, session)
-            elif listener.rule_type == "mention":
-                posts_collected = await self._collect_mention(client, listener, session)
-            elif listener.rule_type == "hashtag":
-                # Hashtags are just keywords with # prefix
-                posts_collected = await self._collect_keyword(client, listener, session)
-            else:
-                logger.warning(f"Unknown rule type: {listener.rule_type}")
-
+            post_views = await self.fetch(listener)
+            new_posts = await self.save_posts(self.to_rows(post_views, listener), session)
+            if new_posts and not listener.initial_scrape_completed:
+                await self._mark_initial_scrape_completed([listener], session)
         except Exception as e:
-            logger.error(f"Error collecting for listener {listener.id}: {e}")
+            logger.error("Error collecting for listener %d: %s", listener.id, e)
             raise
 
-        return posts_collected
-
-    async def _collect_keyword(
-        self, client: Client, listener: Listener, session: AsyncSession
-    ) -> int:
-        """Collect posts matching a keyword search."""
-        search_term = listener.rule_value
-        if listener.rule_type == "hashtag" and not search_term.startswith("#"):
-            search_term = f"#{search_term}"
-
-        # Determine if this is initial scrape or regular scrape
-        is_initial = not listener.initial_scrape_completed
-        max_posts = INITIAL_SCRAPE_MAX_POSTS if is_initial else REGULAR_SCRAPE_LIMIT
-        use_pagination = is_initial
-
-        logger.info(
-            f"Searching Bluesky for: {search_term} "
-            f"({'initial scrape, max ' + str(max_posts) + ' posts' if is_initial else 'regular scrape'})"
-        )
-
-        posts_collected = 0
-        cursor = None
+        return len(new_posts)
 
-        while posts_collected < max_posts:
-            # Calculate limit for this page
-            remaining = max_posts - posts_collected
-            limit = min(PAGE_SIZE, remaining)
+    async def collect_many(
+        self,
+        listeners: list[ListenerTarget],
+        session: AsyncSession,
+        raise_errors: bool = False,
+    ) -> dict[int, int]:
+        """
+        Collect several listeners, saving all their posts together.
 
-            # Search for posts
-            params = {"q": search_term, "limit": limit}
-            if cursor:
-                params["cursor"] = cursor
+        Searches run concurrently (up to bluesky_max_concurrent_listeners at
+        once) and hold no database connection. The posts of every listener are
+        then upserted in batches of SAVE_BATCH_ROWS rows, committing between
+        batches; the caller commits the last one along with its own changes.
+        A listener whose search fails is logged and left out, unless
+        raise_errors is set, in which case the error is raised before saving.
 
-            response = client.app.bsky.feed.search_posts(params=params)
+        Returns:
+            Listener id -> number of new posts, for the listeners searched
+        """
+        if not await self.is_configured():
+            logger.warning("Bluesky not configured, skipping collection")
+            return {}
 
-            if not response.posts:
-                break
+        semaphore = asyncio.Semaphore(settings.bluesky_max_concurrent_listeners)
 
-            for post_view in response.posts:
+        async def fetch_one(listener: ListenerTarget) -> list | None:
+            async with semaphore:
                 try:
-                    saved = await self._save_post(post_view, listener, session)
-                    if saved:
-                        posts_collected += 1
+                    return await self.fetch(listener)
                 except Exception as e:
-                    logger.error(f"Error saving post {post_view.uri}: {e}")
+                    logger.error("Error collecting for listener '%s': %s", listener.name, e)
+                    if raise_errors:
+                        raise
+                    return None
+
+        results = await asyncio.gather(*(fetch_one(listener) for listener in listeners))
+
+        # Keyed by platform_post_id: when listeners find the same post, the first keeps it
+        rows = {}
+        counts = {}
+        for listener, post_views in zip(listeners, results):
+            if post_views is None:
+                continue
+            counts[listener.id] = 0
+            for row in self.to_rows(post_views, listener):
+                rows.setdefault(row["platform_post_id"], row)
+
+        rows = list(rows.values())
+        for start in range(0, len(rows), SAVE_BATCH_ROWS):
+            # The last batch is left for the caller's commit
+            if start:
+                await session.commit()
+            for post in await self.save_posts(rows[start:start + SAVE_BATCH_ROWS], session):
+                counts[post.listener_id] += 1
+
+        completed = [
+            listener for listener in listeners
+            if counts.get(listener.id) and not listener.initial_scrape_completed
+        ]
+        if completed:
+            await self._mark_initial_scrape_completed(completed, session)
+
+        for listener in listeners:
+            if listener.id in counts:
+                logger.info("Collected %d posts for listener '%s'", counts[listener.id], listener.name)
+
+        return counts
+
+    def _search_query(self, listener: ListenerTarget) -> str | None:
+        """Build the search query for the listener's rule (None for unknown rule types)."""
+        if listener.rule_type in ("keyword", "hashtag"):
+            search_term = listener.rule_value
+            # Hashtags are just keywords with # prefix
+            if listener.rule_type == "hashtag" and not search_term.startswith("#"):
+                search_term = f"#{search_term}"
+            return search_term
+
+        if listener.rule_type == "mention":
+            # Search for posts mentioning the handle
+            return f"@{listener.rule_value.removeprefix('@')}"
 
-            # Check if we should continue paginating
-            cursor = getattr(response, 'cursor', None)
-            if not use_pagination or not cursor:
-                break
+        logger.warning("Unknown rule type: %s", listener.rule_type)
+        return None
 
-            logger.info(f"Fetched {posts_collected} posts so far, continuing pagination...")
+    async def fetch(self, listener: ListenerTarget) -> list:
+        """
+        Search Bluesky for posts matching the listener's rule, without touching the database.
 
-        # Mark initial scrape as completed
-        if is_initial and posts_collected > 0:
-            listener.initial_scrape_completed = True
-            await session.flush()
-            logger.info(f"Initial scrape completed for listener {listener.id}, collected {posts_collected} posts")
+        The first scrape of a listener paginates up to INITIAL_SCRAPE_MAX_POSTS
+        posts; later scrapes fetch a single page. The cap counts fetched posts,
+        including ones already stored, since fetching doesn't query the database.
 
-        return posts_collected
+        Returns:
+            The matching post views
+        """
+        search_term = self._search_query(listener)
+        if search_term is None:
+            return []
 
-    async def _collect_mention(
-        self, client: Client, listener: Listener, session: AsyncSession
-    ) -> int:
-        """Collect posts mentioning a specific handle."""
-        handle = listener.rule_value
-        if handle.startswith("@"):
-            handle = handle[1:]
+        client = await self._get_client()
 
         # Determine if this is initial scrape or regular scrape
         is_initial = not listener.initial_scrape_completed
         max_posts = INITIAL_SCRAPE_MAX_POSTS if is_initial else REGULAR_SCRAPE_LIMIT
-        use_pagination = is_initial
 
-        logger.info(
-            f"Searching Bluesky for mentions of: @{handle} "
-            f"({'initial scrape, max ' + str(max_posts) + ' posts' if is_initial else 'regular scrape'})"
-        )
+        if is_initial:
+            logger.info("Searching Bluesky for: %s (initial scrape, max %d posts)", search_term, max_posts)
+        else:
+            logger.info("Searching Bluesky for: %s (regular scrape)", search_term)
 
-        posts_collected = 0
+        post_views = []
         cursor = None
 
-        while posts_collected < max_posts:
+        while len(post_views) < max_posts:
             # Calculate limit for this page
-            remaining = max_posts - posts_collected
-            limit = min(PAGE_SIZE, remaining)
+            limit = min(PAGE_SIZE, max_posts - len(post_views))
 
-            # Search for posts mentioning the handle
-            params = {"q": f"@{handle}", "limit": limit}
+            params = {"q": search_term, "limit": limit}
             if cursor:
                 params["cursor"] = cursor
 
-            response = client.app.bsky.feed.search_posts(params=params)
+            response = await self._search_posts(client, params, use_cache=not is_initial)
 
             if not response.posts:
                 break
 
-            for post_view in response.posts:
-                try:
-                    saved = await self._save_post(post_view, listener, session)
-                    if saved:
-                        posts_collected += 1
-                except Exception as e:
-                    logger.error(f"Error saving post {post_view.uri}: {e}")
+            post_views.extend(response.posts)
 
             # Check if we should continue paginating
             cursor = getattr(response, 'cursor', None)
-            if not use_pagination or not cursor:
+            if not is_initial or not cursor:
                 break
 
-            logger.info(f"Fetched {posts_collected} posts so far, continuing pagination...")
-
-        # Mark initial scrape as completed
-        if is_initial and posts_collected > 0:
-            listener.initial_scrape_completed = True
-            await session.flush()
-            logger.info(f"Initial scrape completed for listener {listener.id}, collected {posts_collected} posts")
+            logger.info("Fetched %d posts so far, continuing pagination...", len(post_views))
 
-        return posts_collected
+        return post_views
 
-    async def _save_post(
-        self, post_view, listener: Listener, session: AsyncSession
-    ) -> bool:
-        """
-        Save a post to the database and run NLP processing.
-
-        NLP processing is failsafe - errors are logged but don't break the pipeline.
-
-        Returns:
-            True if post was newly inserted, False if it already existed
-        """
-        # Extract post ID from URI (format: at://did:plc:xxx/app.bsky.feed.post/xxx)
-        platform_post_id = post_view.uri
-
-        # Extract author info
-        author = post_view.author
-        author_handle = author.handle
-        author_display_name = author.display_name
-        author_avatar_url = author.avatar
+    async def _mark_initial_scrape_completed(
+        self, listeners: list[ListenerTarget], session: AsyncSession
+    ) -> None:
+        """Record that the listeners' paginated first scrapes are done."""
+        await session.execute(
+            update(Listener)
+            .where(Listener.id.in_([listener.id for listener in listeners]))
+            .values(initial_scrape_completed=True)
+        )
+        for listener in listeners:
+            listener.initial_scrape_completed = True
+            logger.info("Initial scrape completed for listener %d", listener.id)
 
-        # Extract post content
-        record = post_view.record
-        content = record.text if hasattr(record, "text") else None
+    def _post_view_to_row(self, post_view, listener: ListenerTarget) -> dict:
+        """Extract the posts table columns from a Bluesky post view."""
+        # Post ID is the URI (format: at://did:plc:xxx/app.bsky.feed.post/xxx)
+        platform_post_id, author, record, likes, replies, reposts = _post_view_fields(post_view)
+        author_handle, author_display_name, author_avatar_url = _author_fields(author)
 
         # Build post URL
         # Format: https://bsky.app/profile/{handle}/post/{post_id}
-        post_rkey = post_view.uri.split("/")[-1]
+        post_rkey = platform_post_id.rpartition("/")[2]
         post_url = f"https://bsky.app/profile/{author_handle}/post/{post_rkey}"
 
-        # Extract engagement metrics
-        likes_count = post_view.like_count or 0
-        replies_count = post_view.reply_count or 0
-        reposts_count = post_view.repost_count or 0
-        quotes_count = post_view.quote_count or 0 if hasattr(post_view, "quote_count") else 0
-
-        # Parse post creation time (strip timezone for naive datetime storage)
+        # Parse post creation time (fromisoformat accepts a trailing "Z" since 3.11)
         post_created_at = None
-        if hasattr(record, "created_at"):
+        created_at = getattr(record, "created_at", None)
+        if created_at:
             try:
-                dt = datetime.fromisoformat(record.created_at.replace("Z", "+00:00"))
+                dt = datetime.fromisoformat(created_at)
                 # Convert to naive UTC datetime for PostgreSQL TIMESTAMP WITHOUT TIME ZONE
-                post_created_at = dt.replace(tzinfo=None)
-            except Exception:
+                if dt.tzinfo is not None:
+                    dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+                post_created_at = dt
+            except (TypeError, ValueError):
                 pass
 
-        # Check if post already exists (to determine if we need to run NLP)
-        existing = await session.execute(
-            select(Post).where(
-                Post.platform == "bluesky",
-                Post.platform_post_id == platform_post_id,
-            )
-        )
-        existing_post = existing.scalar_one_or_none()
-        is_new_post = existing_post is None
-
-        # Use PostgreSQL upsert to handle duplicates
-        stmt = insert(Post).values(
-            listener_id=listener.id,
-            platform="bluesky",
-            platform_post_id=platform_post_id,
-            author_handle=author_handle,
-            author_display_name=author_display_name,
-            author_avatar_url=author_avatar_url,
-            content=content,
-            post_url=post_url,
-            likes_count=likes_count,
-            replies_count=replies_count,
-            reposts_count=reposts_count,
-            quotes_count=quotes_count,
-            post_created_at=post_created_at,
-            collected_at=datetime.utcnow(),
-        )
-
-        # On conflict, update engagement metrics (they may have changed)
-        stmt = stmt.on_conflict_do_update(
-            constraint="uq_platform_post",
-            set_={
-                "likes_count": stmt.excluded.likes_count,
-                "replies_count": stmt.excluded.replies_count,
-                "reposts_count": stmt.excluded.reposts_count,
-                "quotes_count": stmt.excluded.quotes_count,
-            },
-        )
-
-        await session.execute(stmt)
-        await session.flush()
-
-        # Run NLP processing for new posts only
-        if is_new_post:
-            # Fetch the post we just inserted
-            result = await session.execute(
-                select(Post).where(
-                    Post.platform == "bluesky",
-                    Post.platform_post_id == platform_post_id,
-                )
-            )
-            post = result.scalar_one()
-
-            # Process with NLP (failsafe - won't raise exceptions)
+        return {
+            "listener_id": listener.id,
+            "platform": "bluesky",
+            "platform_post_id": platform_post_id,
+            "author_handle": author_handle,
+            "author_display_name": author_display_name,
+            "author_avatar_url": author_avatar_url,
+            "content": getattr(record, "text", None),
+            "post_url": post_url,
+            # Engagement metrics
+            "likes_count": likes or 0,
+            "replies_count": replies or 0,
+            "reposts_count": reposts or 0,
+            "quotes_count": getattr(post_view, "quote_count", None) or 0,
+            "post_created_at": post_created_at,
+        }
+
+    def to_rows(self, post_views, listener: ListenerTarget) -> list[dict]:
+        """Build posts table rows from post views, skipping (and logging) malformed ones."""
+        rows = []
+        for post_view in post_views:
             try:
-                await nlp_processor.process_post(post, session)
-                await session.flush()
+                rows.append(self._post_view_to_row(post_view, listener))
             except Exception as e:
-                # This shouldn't happen as process_post is failsafe,
-                # but just in case, log and continue
-                logger.error(f"Unexpected NLP error for post {post.id}: {e}")
-                post.nlp_error = f"Unexpected error: {str(e)}"
+                logger.error("Error saving post %s: %s", post_view.uri, e)
+        return rows
+
+    async def save_posts(self, rows: list[dict], session: AsyncSession) -> list[Post]:
+        """
+        Upsert post rows in one statement.
+
+        New posts are left unprocessed (no nlp_processed_at) for the NLP
+        worker, which the caller notifies once they are committed. Their
+        collected_at is the column's default, the database's UTC clock at the
+        start of the transaction, so one batch shares a single timestamp.
 
-        return is_new_post
+        Returns:
+            The newly inserted posts
+        """
+        # One INSERT ... ON CONFLICT cannot touch a row twice
+        rows = list({row["platform_post_id"]: row for row in rows}.values())
+        if not rows:
+            return []
+
+        # One statement for the whole batch; asyncpg prepares it per connection
+        result = await session.execute(
+            POST_UPSERT,
+            rows,
+            execution_options={"populate_existing": True},
+        )
+        return [row.Post for row in result if row.inserted]
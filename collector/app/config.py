@@ -4,11 +4,33 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     # Database
     database_url: str = "postgresql+asyncpg://postgres:postgres@db:5432/sociallistener"
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_pre_ping: bool = True
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    # Per-connection prepared statement cache (set to 0 behind a transaction-mode pooler)
+    db_statement_cache_size: int = 512
 
     # Bluesky
     bluesky_handle: str = ""
     bluesky_app_password: str = ""
     bluesky_poll_interval: int = 120  # seconds
+    # Quiet listeners are polled less often, down to once per this many seconds
+    bluesky_max_poll_interval: int = 1800  # seconds
+    # Where the login session is saved so restarts can resume it instead of logging in
+    bluesky_session_file: str = "/tmp/bluesky_session"
+    # Reuse identical search responses for this long (keep below the poll interval)
+    bluesky_search_cache_ttl: int = 60  # seconds
+    # Listeners collected at once by the scheduled job (each holds a pooled connection)
+    bluesky_max_concurrent_listeners: int = 4
+
+    # NLP
+    # Run spaCy on a GPU when one is available (requires spacy[cuda12x])
+    nlp_use_gpu: bool = False
+    # Processes for each NER batch (nlp.pipe n_process). spaCy forks them per
+    # batch, so raise it only together with a large NLP batch size
+    nlp_n_process: int = 1
 
     # Logging
     log_level: str = "INFO"
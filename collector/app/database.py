@@ -1,3 +1,6 @@
+import asyncio
+
+from sqlalchemy import func, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
@@ -6,6 +9,16 @@ from app.config import settings
 engine = create_async_engine(
     settings.database_url,
     echo=settings.log_level == "DEBUG",
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    connect_args={
+        # SQLAlchemy's and asyncpg's statement caches, so the per-page upserts skip parsing
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+        "statement_cache_size": settings.db_statement_cache_size,
+    },
 )
 
 async_session = async_sessionmaker(
@@ -19,6 +32,11 @@ class Base(DeclarativeBase):
     pass
 
 
+def utc_now():
+    """The database's current time as a naive UTC timestamp, like the TIMESTAMP columns."""
+    return func.timezone("UTC", func.now())
+
+
 async def get_session() -> AsyncSession:
     async with async_session() as session:
         yield session
@@ -28,3 +46,44 @@ async def init_db():
     """Create all tables. For development only - use Alembic in production."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+
+
+async def warm_pool() -> None:
+    """Open `db_pool_size` connections up front so the first collection doesn't pay for connecting."""
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(ping() for _ in range(settings.db_pool_size)))
+
+
+# Materialized rollups read by the API, refreshed after collections
+ROLLUP_VIEWS = ("entity_occurrence_counts", "post_daily_counts")
+
+
+# Bumped by a trigger on every DELETE from posts, through the API or here
+POSTS_DELETE_SEQ = text("SELECT last_value FROM posts_delete_seq")
+
+# posts_delete_seq as of the last rollup refresh (None until the first one)
+_refreshed_delete_seq: int | None = None
+
+
+async def posts_deleted_since_refresh() -> bool:
+    """Whether posts were deleted since the rollups were last refreshed."""
+    async with engine.connect() as conn:
+        deletes = await conn.scalar(POSTS_DELETE_SEQ)
+    return deletes != _refreshed_delete_seq
+
+
+async def refresh_rollup_views():
+    """Refresh the materialized rollups read by the API's analytics and entity endpoints."""
+    global _refreshed_delete_seq
+    async with engine.begin() as conn:
+        # Read before refreshing: a delete that lands meanwhile triggers another refresh
+        deletes = await conn.scalar(POSTS_DELETE_SEQ)
+        for view in ROLLUP_VIEWS:
+            await conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+        # Lets the API change its ETags once the rollups are fresh
+        await conn.execute(text("SELECT nextval('rollup_refresh_seq')"))
+    _refreshed_delete_seq = deletes
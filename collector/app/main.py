@@ -1,16 +1,32 @@
+import asyncio
 import logging
+import time
 from contextlib import asynccontextmanager
-from datetime import datetime
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from fastapi import Depends, FastAPI, HTTPException
-from sqlalchemy import select
+from cachetools import TTLCache
+from fastapi import Depends, FastAPI, HTTPException, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import bindparam, case, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.collectors.base import ListenerTarget
 from app.collectors.bluesky import BlueskyCollector
 from app.config import settings
-from app.database import async_session, get_session, init_db
+from app.database import (
+    async_session,
+    get_session,
+    init_db,
+    posts_deleted_since_refresh,
+    refresh_rollup_views,
+    utc_now,
+    warm_pool,
+)
 from app.models import Listener, Post, Entity, PostEntity
+from app.nlp.ner import get_ner_model
+from app.nlp.processor import nlp_processor
+from app.nlp.sentiment import get_sentiment_analyzer
 from app.schemas import (
     CollectRequest,
     CollectResponse,
@@ -19,6 +35,7 @@ from app.schemas import (
     ListenerResponse,
     PostResponse,
     EntityResponse,
+    PostEntityResponse,
 )
 from app.schemas.collector import SchedulerJob
 
@@ -35,35 +52,142 @@ scheduler = AsyncIOScheduler()
 # Collector instances
 bluesky_collector = BlueskyCollector()
 
+# Columns read by the list endpoints: just their response fields, returned as
+# plain rows instead of hydrated ORM objects
+POST_RESPONSE_COLUMNS = [getattr(Post, field) for field in PostResponse.model_fields]
+ENTITY_RESPONSE_COLUMNS = [getattr(Entity, field) for field in EntityResponse.model_fields]
+
+# Serializers for responses built from trusted rows with model_construct
+LISTENERS_ADAPTER = TypeAdapter(list[ListenerResponse])
+ENTITIES_ADAPTER = TypeAdapter(list[EntityResponse])
+POST_ENTITIES_ADAPTER = TypeAdapter(list[PostEntityResponse])
+
+# Top entities by (entity_type, limit); cleared whenever posts are analyzed or deleted
+top_entities_cache = TTLCache(maxsize=256, ttl=settings.bluesky_poll_interval)
+
+
+# Adaptive polling aims for about this many new posts per poll (well below a
+# regular scrape's 100), so each listener is polled every POSTS_PER_POLL times
+# its average gap between new posts, within [poll interval, max poll interval]
+POSTS_PER_POLL = 10
+# Weight of the latest poll in the moving average of the gap between posts
+POST_INTERVAL_SMOOTHING = 0.3
+
+
+def trusted_json(adapter: TypeAdapter, models: list) -> Response:
+    """
+    Serialize response models built from database rows.
+
+    Returning a Response skips FastAPI's dump and re-validation against the
+    route's response_model, which then only documents the schema.
+    """
+    return Response(adapter.dump_json(models), media_type="application/json")
+
+
+def seconds_since_polled():
+    """Seconds since the listener was last polled, in SQL (NULL if never polled)."""
+    return func.extract("epoch", utc_now() - Listener.last_polled_at)
+
+
+def poll_interval():
+    """The listener's adaptive poll interval in seconds, in SQL."""
+    # greatest() skips NULLs, so listeners without an average use the poll interval
+    return func.least(
+        func.greatest(POSTS_PER_POLL * Listener.avg_post_interval, settings.bluesky_poll_interval),
+        settings.bluesky_max_poll_interval,
+    )
+
+
+# Listener queries are built once; reusing a statement also reuses its
+# compiled form's cache key. Active Bluesky listeners, as the columns a
+# collection needs:
+ACTIVE_LISTENERS = select(*ListenerTarget.columns).where(
+    Listener.is_active == True,
+    Listener.platform.in_(["bluesky", "all"]),
+)
+# ... one of them, by the "listener_id" parameter
+ACTIVE_LISTENER_BY_ID = ACTIVE_LISTENERS.where(Listener.id == bindparam("listener_id"))
+# ... those whose adaptive poll interval has elapsed (to the nearest scheduler run)
+DUE_LISTENERS = ACTIVE_LISTENERS.where(
+    or_(
+        Listener.last_polled_at.is_(None),
+        seconds_since_polled() >= poll_interval() - settings.bluesky_poll_interval / 2,
+    )
+)
+
+
+async def mark_polled(session: AsyncSession, counts: dict[int, int]) -> None:
+    """
+    Set last_polled_at on the polled listeners (listener id -> new posts), and
+    has_new_content on those with new posts, in a single UPDATE.
+
+    Also folds the gap between new posts seen since the previous poll into
+    each listener's avg_post_interval. A poll without new posts counts as one
+    gap of the whole time since the previous poll, so quiet listeners back off.
+    """
+    if not counts:
+        return
+    with_new_posts = [listener_id for listener_id, count in counts.items() if count > 0]
+    observed_interval = seconds_since_polled() / func.greatest(case(counts, value=Listener.id), 1)
+    await session.execute(
+        update(Listener)
+        .where(Listener.id.in_(list(counts)))
+        .values(
+            last_polled_at=utc_now(),
+            has_new_content=case(
+                (Listener.id.in_(with_new_posts), True),
+                else_=Listener.has_new_content,
+            ),
+            avg_post_interval=func.coalesce(
+                POST_INTERVAL_SMOOTHING * observed_interval
+                + (1 - POST_INTERVAL_SMOOTHING) * Listener.avg_post_interval,
+                observed_interval,
+            ),
+        )
+    )
+
 
 async def scheduled_collect():
-    """Scheduled job to collect posts for all active listeners."""
+    """Scheduled job to collect posts for the active listeners due for a poll."""
     logger.info("Running scheduled collection...")
     async with async_session() as session:
-        # Get all active Bluesky listeners
-        result = await session.execute(
-            select(Listener).where(
-                Listener.is_active == True,
-                Listener.platform.in_(["bluesky", "all"]),
-            )
-        )
-        listeners = result.scalars().all()
+        # Get the active Bluesky listeners due for a poll
+        result = await session.execute(DUE_LISTENERS)
+        listeners = [ListenerTarget(**row._mapping) for row in result]
+
+        # Searches run concurrently, then all listeners' posts are saved together
+        try:
+            counts = await bluesky_collector.collect_many(listeners, session)
+            await mark_polled(session, counts)
+            await session.commit()
+            if any(counts.values()):
+                nlp_processor.notify()
+        except Exception as e:
+            logger.error("Error saving scheduled collection: %s", e)
+            await session.rollback()
+            counts = {}
+
+    logger.info("Scheduled collection complete. Total posts: %d", sum(counts.values()))
+
+    # New posts are added to the rollups by the NLP worker once their entities
+    # are stored; posts deleted through the API (or with a listener) are
+    # dropped here
+    try:
+        deleted = await posts_deleted_since_refresh()
+    except Exception as e:
+        logger.error("Error checking for deleted posts: %s", e)
+        deleted = False
+    if deleted:
+        await refresh_rollups()
 
-        total_posts = 0
-        for listener in listeners:
-            try:
-                count = await bluesky_collector.collect(listener, session)
-                total_posts += count
-                listener.last_polled_at = datetime.utcnow()
-                if count > 0:
-                    listener.has_new_content = True
-                await session.commit()
-                logger.info(f"Collected {count} posts for listener '{listener.name}'")
-            except Exception as e:
-                logger.error(f"Error collecting for listener '{listener.name}': {e}")
-                await session.rollback()
 
-        logger.info(f"Scheduled collection complete. Total posts: {total_posts}")
+async def refresh_rollups():
+    """Refresh aggregate views after posts were analyzed or deleted."""
+    top_entities_cache.clear()
+    try:
+        await refresh_rollup_views()
+    except Exception as e:
+        logger.error("Error refreshing rollup views: %s", e)
 
 
 @asynccontextmanager
@@ -74,6 +198,24 @@ async def lifespan(app: FastAPI):
     # Initialize database
     await init_db()
     logger.info("Database initialized")
+    try:
+        await warm_pool()
+        logger.info("Database pool warmed")
+    except Exception as e:
+        logger.warning("Could not warm database pool: %s", e)
+
+    # Load the NLP models now (off the event loop) instead of on the first collection
+    started = time.perf_counter()
+    await asyncio.gather(
+        asyncio.to_thread(get_ner_model),
+        asyncio.to_thread(get_sentiment_analyzer),
+    )
+    logger.info("NLP models loaded in %.1fs", time.perf_counter() - started)
+
+    # Analyze collected posts in the background, starting with any left
+    # unprocessed, and refresh the rollups once their results are stored
+    nlp_worker = asyncio.create_task(nlp_processor.run_worker(on_processed=refresh_rollups))
+    nlp_processor.notify()
 
     # Start scheduler
     scheduler.add_job(
@@ -85,12 +227,13 @@ async def lifespan(app: FastAPI):
         replace_existing=True,
     )
     scheduler.start()
-    logger.info(f"Scheduler started (poll interval: {settings.bluesky_poll_interval}s)")
+    logger.info("Scheduler started (poll interval: %ds)", settings.bluesky_poll_interval)
 
     yield
 
     # Shutdown
     scheduler.shutdown()
+    nlp_worker.cancel()
     logger.info("Collector service stopped")
 
 
@@ -99,6 +242,7 @@ app = FastAPI(
     description="Collects posts from social media platforms",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -149,34 +293,26 @@ async def collect_bluesky(
     if not await bluesky_collector.is_configured():
         raise HTTPException(status_code=400, detail="Bluesky credentials not configured")
 
-    # Build query for listeners
-    query = select(Listener).where(
-        Listener.is_active == True,
-        Listener.platform.in_(["bluesky", "all"]),
-    )
-
     if request and request.listener_id:
-        query = query.where(Listener.id == request.listener_id)
-
-    result = await session.execute(query)
-    listeners = result.scalars().all()
+        result = await session.execute(ACTIVE_LISTENER_BY_ID, {"listener_id": request.listener_id})
+    else:
+        result = await session.execute(ACTIVE_LISTENERS)
+    listeners = [ListenerTarget(**row._mapping) for row in result]
 
     if not listeners:
         raise HTTPException(status_code=404, detail="No active Bluesky listeners found")
 
-    total_posts = 0
-    for listener in listeners:
-        try:
-            count = await bluesky_collector.collect(listener, session)
-            total_posts += count
-            listener.last_polled_at = datetime.utcnow()
-            if count > 0:
-                listener.has_new_content = True
-        except Exception as e:
-            logger.error(f"Error collecting for listener '{listener.name}': {e}")
-            raise HTTPException(status_code=500, detail=str(e))
+    # Searches run concurrently; any failed listener fails the request
+    try:
+        counts = await bluesky_collector.collect_many(listeners, session, raise_errors=True)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
+    total_posts = sum(counts.values())
+    await mark_polled(session, counts)
     await session.commit()
+    if total_posts > 0:
+        nlp_processor.notify()
 
     return CollectResponse(
         status="success",
@@ -211,7 +347,7 @@ async def test_bluesky_connection():
 async def list_listeners(session: AsyncSession = Depends(get_session)):
     """List all listeners."""
     result = await session.execute(select(Listener))
-    return result.scalars().all()
+    return trusted_json(LISTENERS_ADAPTER, [ListenerResponse.from_row(row) for row in result.scalars()])
 
 
 @app.post("/listeners", response_model=ListenerResponse)
@@ -233,8 +369,7 @@ async def get_listener(
     session: AsyncSession = Depends(get_session),
 ):
     """Get a specific listener."""
-    result = await session.execute(select(Listener).where(Listener.id == listener_id))
-    listener = result.scalar_one_or_none()
+    listener = await session.get(Listener, listener_id)
     if not listener:
         raise HTTPException(status_code=404, detail="Listener not found")
     return listener
@@ -246,12 +381,13 @@ async def delete_listener(
     session: AsyncSession = Depends(get_session),
 ):
     """Delete a listener."""
-    result = await session.execute(select(Listener).where(Listener.id == listener_id))
-    listener = result.scalar_one_or_none()
+    listener = await session.get(Listener, listener_id)
     if not listener:
         raise HTTPException(status_code=404, detail="Listener not found")
     await session.delete(listener)
     await session.commit()
+    # The listener's posts and their entity mentions were deleted with it
+    top_entities_cache.clear()
     return {"status": "deleted", "id": listener_id}
 
 
@@ -267,11 +403,11 @@ async def list_posts(
     session: AsyncSession = Depends(get_session),
 ):
     """List collected posts."""
-    query = select(Post).order_by(Post.collected_at.desc()).limit(limit)
+    query = select(*POST_RESPONSE_COLUMNS).order_by(Post.collected_at.desc()).limit(limit)
     if listener_id:
         query = query.where(Post.listener_id == listener_id)
     result = await session.execute(query)
-    return result.scalars().all()
+    return result.mappings().all()
 
 
 @app.get("/posts/{post_id}", response_model=PostResponse)
@@ -299,11 +435,11 @@ async def list_entities(
     session: AsyncSession = Depends(get_session),
 ):
     """List all unique entities."""
-    query = select(Entity).order_by(Entity.created_at.desc()).limit(limit)
+    query = select(*ENTITY_RESPONSE_COLUMNS).order_by(Entity.created_at.desc()).limit(limit)
     if entity_type:
         query = query.where(Entity.entity_type == entity_type)
     result = await session.execute(query)
-    return result.scalars().all()
+    return trusted_json(ENTITIES_ADAPTER, [EntityResponse.from_row(row) for row in result.mappings()])
 
 
 @app.get("/entities/top")
@@ -312,8 +448,24 @@ async def top_entities(
     limit: int = 20,
     session: AsyncSession = Depends(get_session),
 ):
-    """Get top entities by occurrence count."""
-    from sqlalchemy import func
+    """Get top entities by occurrence count.
+
+    Mentions are counted per entity_id on post_entities alone (an index-only
+    scan of idx_post_entities_entity), and only the top `limit` are joined to
+    entities. Results are cached until new posts are analyzed.
+    """
+    key = (entity_type, limit)
+    cached = top_entities_cache.get(key)
+    if cached is not None:
+        return cached
+
+    occurrence_count = func.count().label("occurrence_count")
+    counts = select(PostEntity.entity_id, occurrence_count).group_by(PostEntity.entity_id)
+    if entity_type:
+        counts = counts.where(
+            PostEntity.entity_id.in_(select(Entity.id).where(Entity.entity_type == entity_type))
+        )
+    top = counts.order_by(occurrence_count.desc()).limit(limit).subquery()
 
     query = (
         select(
@@ -321,21 +473,16 @@ async def top_entities(
             Entity.entity_type,
             Entity.entity_text,
             Entity.display_text,
-            func.count(PostEntity.id).label("occurrence_count"),
+            top.c.occurrence_count,
         )
-        .join(PostEntity, Entity.id == PostEntity.entity_id)
-        .group_by(Entity.id)
-        .order_by(func.count(PostEntity.id).desc())
-        .limit(limit)
+        .join(top, Entity.id == top.c.entity_id)
+        .order_by(top.c.occurrence_count.desc())
     )
 
-    if entity_type:
-        query = query.where(Entity.entity_type == entity_type)
-
     result = await session.execute(query)
     rows = result.all()
 
-    return [
+    entities = [
         {
             "id": row.id,
             "entity_type": row.entity_type,
@@ -345,21 +492,18 @@ async def top_entities(
         }
         for row in rows
     ]
+    top_entities_cache[key] = entities
+    return entities
 
 
-@app.get("/posts/{post_id}/entities")
+@app.get("/posts/{post_id}/entities", response_model=list[PostEntityResponse])
 async def get_post_entities(
     post_id: int,
     session: AsyncSession = Depends(get_session),
 ):
     """Get entities for a specific post."""
-    # Check post exists
-    result = await session.execute(select(Post).where(Post.id == post_id))
-    post = result.scalar_one_or_none()
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-
-    # Get entities via junction table
+    # Post and its entities in one round-trip; the outer joins keep the post
+    # row when it has no entities, so an empty result means it doesn't exist
     query = (
         select(
             PostEntity.id,
@@ -371,23 +515,18 @@ async def get_post_entities(
             Entity.entity_text,
             Entity.display_text,
         )
-        .join(Entity, PostEntity.entity_id == Entity.id)
-        .where(PostEntity.post_id == post_id)
+        .select_from(Post)
+        .outerjoin(PostEntity, PostEntity.post_id == Post.id)
+        .outerjoin(Entity, PostEntity.entity_id == Entity.id)
+        .where(Post.id == post_id)
     )
 
     result = await session.execute(query)
     rows = result.all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Post not found")
 
-    return [
-        {
-            "id": row.id,
-            "entity_id": row.entity_id,
-            "entity_type": row.entity_type,
-            "entity_text": row.entity_text,
-            "display_text": row.display_text,
-            "confidence": row.confidence,
-            "start_pos": row.start_pos,
-            "end_pos": row.end_pos,
-        }
-        for row in rows
-    ]
+    return trusted_json(
+        POST_ENTITIES_ADAPTER,
+        [PostEntityResponse.from_row(row) for row in rows if row.id is not None],
+    )
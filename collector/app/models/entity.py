@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -16,7 +16,7 @@ class Entity(Base):
     entity_type: Mapped[str] = mapped_column(String(100), nullable=False)  # 'PERSON' | 'ORG' | 'PRODUCT' | etc.
     entity_text: Mapped[str] = mapped_column(String(500), nullable=False)  # Normalized text
     display_text: Mapped[str] = mapped_column(String(500), nullable=False)  # Original text as found
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.timezone("UTC", func.now()))
 
     # Relationships
     post_entities: Mapped[list["PostEntity"]] = relationship("PostEntity", back_populates="entity")
@@ -39,7 +39,7 @@ class PostEntity(Base):
     confidence: Mapped[float | None] = mapped_column(Float, nullable=True)
     start_pos: Mapped[int | None] = mapped_column(Integer, nullable=True)
     end_pos: Mapped[int | None] = mapped_column(Integer, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.timezone("UTC", func.now()))
 
     # Relationships
     post: Mapped["Post"] = relationship("Post", back_populates="post_entities")
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Integer, String
+from sqlalchemy import Boolean, DateTime, Float, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -8,6 +8,8 @@ from app.database import Base
 
 class Listener(Base):
     __tablename__ = "listeners"
+    # Fetch the server-generated timestamps with RETURNING on INSERT/UPDATE
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -19,8 +21,12 @@ class Listener(Base):
     initial_scrape_completed: Mapped[bool] = mapped_column(Boolean, default=False)
     poll_frequency: Mapped[int] = mapped_column(Integer, default=300)  # seconds
     last_polled_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Moving average of seconds between new posts, drives the adaptive poll interval
+    avg_post_interval: Mapped[float | None] = mapped_column(Float, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
 
     # Relationships
     posts: Mapped[list["Post"]] = relationship("Post", back_populates="listener", cascade="all, delete-orphan")
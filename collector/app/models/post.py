@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, Text, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -39,7 +39,7 @@ class Post(Base):
 
     # Timestamps
     post_created_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
-    collected_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    collected_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.timezone("UTC", func.now()))
 
     # Relationships
     listener: Mapped["Listener"] = relationship("Listener", back_populates="posts")
@@ -1,21 +1,42 @@
 import logging
+import threading
 from dataclasses import dataclass
 
 import spacy
 
+from app.config import settings
+
 logger = logging.getLogger(__name__)
 
 # Global model instance (loaded once)
 _nlp_model = None
+# StringStore hashes of RELEVANT_ENTITY_TYPES, set when the model loads
+_relevant_label_ids: frozenset[int] = frozenset()
+# NLP runs in worker threads; only one of them should load the model
+_load_lock = threading.Lock()
+
+# Only doc.ents is read, so skip the components that don't feed NER
+DISABLED_PIPES = ["morphologizer", "parser", "lemmatizer", "attribute_ruler", "senter"]
+
+# Texts per minibatch in extract_entities_batch
+NER_BATCH_SIZE = 64
 
 
 def get_ner_model():
     """Get or load the spaCy NER model (singleton pattern)."""
-    global _nlp_model
+    global _nlp_model, _relevant_label_ids
     if _nlp_model is None:
-        logger.info("Loading spaCy model: pt_core_news_sm (Portuguese)")
-        _nlp_model = spacy.load("pt_core_news_sm")
-        logger.info("spaCy model loaded successfully")
+        with _load_lock:
+            if _nlp_model is None:
+                if settings.nlp_use_gpu:
+                    # Falls back to the CPU when no GPU is available
+                    logger.info("spaCy GPU enabled: %s", spacy.prefer_gpu())
+                logger.info("Loading spaCy model: pt_core_news_sm (Portuguese)")
+                nlp = spacy.load("pt_core_news_sm", disable=DISABLED_PIPES)
+                # Entity labels are compared as integer hashes, skipping the label_ string lookup
+                _relevant_label_ids = frozenset(nlp.vocab.strings[label] for label in RELEVANT_ENTITY_TYPES)
+                _nlp_model = nlp
+                logger.info("spaCy model loaded successfully")
     return _nlp_model
 
 
@@ -53,12 +74,45 @@ def extract_entities(text: str) -> list[EntityResult]:
         return []
 
     nlp = get_ner_model()
-    doc = nlp(text)
+    return _doc_entities(nlp(text))
+
+
+def extract_entities_batch(texts: list[str]) -> list[list[EntityResult]]:
+    """
+    Extract named entities from several texts with a single nlp.pipe call.
+
+    spaCy processes the texts in minibatches of NER_BATCH_SIZE, which is much
+    cheaper than calling the model once per text, spread over
+    settings.nlp_n_process processes.
 
+    Args:
+        texts: The texts to analyze
+
+    Returns:
+        List of EntityResult lists, in the same order as texts
+    """
+    results: list[list[EntityResult]] = [[] for _ in texts]
+    indexed = [(i, text) for i, text in enumerate(texts) if text and text.strip()]
+    if not indexed:
+        return results
+
+    nlp = get_ner_model()
+    docs = nlp.pipe(
+        [text for _, text in indexed],
+        batch_size=NER_BATCH_SIZE,
+        n_process=settings.nlp_n_process,
+    )
+    for (i, _), doc in zip(indexed, docs):
+        results[i] = _doc_entities(doc)
+    return results
+
+
+def _doc_entities(doc) -> list[EntityResult]:
+    """Convert a processed spaCy Doc's entities to EntityResults."""
     entities = []
     for ent in doc.ents:
         # Filter to relevant entity types
-        if ent.label_ not in RELEVANT_ENTITY_TYPES:
+        if ent.label not in _relevant_label_ids:
             continue
 
         # Skip very short entities (likely noise)
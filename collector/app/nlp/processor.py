@@ -1,4 +1,6 @@
+import asyncio
 import logging
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -6,16 +8,22 @@ from sqlalchemy import select
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database import async_session, utc_now
 from app.models import Post, Entity, PostEntity
 from app.nlp.sentiment import analyze_sentiment, SentimentResult
-from app.nlp.ner import extract_entities, EntityResult
+from app.nlp.ner import extract_entities, extract_entities_batch, EntityResult
 
 logger = logging.getLogger(__name__)
 
+# Posts the background worker analyzes per batch (and transaction)
+NLP_MAX_BATCH_SIZE = 64
+# How long the worker waits after a notification for more posts to arrive
+NLP_BATCH_WAIT = 0.2  # seconds
+
 
 @dataclass
 class NLPResult:
-    sentiment: SentimentResult
+    sentiment: SentimentResult | None
     entities: list[EntityResult]
     error: str | None = None
 
@@ -24,8 +32,46 @@ class NLPProcessor:
     """
     NLP Processor for analyzing post content.
     Handles sentiment analysis and named entity recognition.
+
+    Collected posts are analyzed by a background worker (run_worker), which
+    collectors wake up with notify() after committing new posts.
     """
 
+    def __init__(self):
+        self._pending = asyncio.Event()
+
+    def analyze(self, text: str) -> NLPResult:
+        """
+        Run sentiment analysis and NER on a text.
+
+        CPU-bound and free of I/O, so it can run in a worker thread. Failures
+        are returned in NLPResult.error instead of raised.
+        """
+        try:
+            return NLPResult(
+                sentiment=analyze_sentiment(text),
+                entities=extract_entities(text),
+            )
+        except Exception as e:
+            return NLPResult(sentiment=None, entities=[], error=str(e))
+
+    def analyze_batch(self, texts: list[str]) -> list[NLPResult]:
+        """
+        Run sentiment analysis and NER on several texts.
+
+        NER goes through spaCy's nlp.pipe for the whole batch. If that fails,
+        each text is analyzed on its own so the error only marks the posts it
+        belongs to.
+        """
+        try:
+            entities = extract_entities_batch(texts)
+            return [
+                NLPResult(sentiment=analyze_sentiment(text), entities=text_entities)
+                for text, text_entities in zip(texts, entities)
+            ]
+        except Exception:
+            return [self.analyze(text) for text in texts]
+
     async def process_post(self, post: Post, session: AsyncSession) -> bool:
         """
         Process a single post with NLP analysis.
@@ -40,113 +86,106 @@ class NLPProcessor:
         Returns:
             True if processing succeeded, False if it failed
         """
-        if not post.content:
-            logger.debug(f"Post {post.id} has no content, skipping NLP")
-            post.nlp_processed_at = datetime.utcnow()
-            return True
-
-        try:
-            # Run sentiment analysis
-            sentiment = analyze_sentiment(post.content)
-            post.sentiment_score = sentiment.score
-            post.sentiment_label = sentiment.label
-
-            # Run NER
-            entities = extract_entities(post.content)
+        result = await asyncio.to_thread(self.analyze, post.content) if post.content else None
+        processed_at = await session.scalar(select(utc_now()))
+        success = self._store_result(post, result, processed_at)
+        if success and result is not None:
+            await self._store_entities([(post, result.entities)], session)
+        return success
 
-            # Store entities with deduplication
-            await self._store_entities(post, entities, session)
-
-            # Mark as processed
-            post.nlp_processed_at = datetime.utcnow()
-            post.nlp_error = None
+    def _store_result(
+        self,
+        post: Post,
+        result: NLPResult | None,
+        processed_at: datetime,
+    ) -> bool:
+        """
+        Store an analysis result's sentiment and status on the post (None
+        means the post has no content). Entities are stored separately.
 
-            logger.debug(
-                f"Post {post.id} processed: sentiment={sentiment.label}, "
-                f"entities={len(entities)}"
-            )
+        Returns:
+            True if processing succeeded, False if it failed
+        """
+        if result is None:
+            logger.debug("Post %d has no content, skipping NLP", post.id)
+            post.nlp_processed_at = processed_at
             return True
 
-        except Exception as e:
-            error_msg = f"NLP processing failed: {str(e)}"
-            logger.error(f"Post {post.id}: {error_msg}")
+        if result.error:
+            error_msg = f"NLP processing failed: {result.error}"
+            logger.error("Post %d: %s", post.id, error_msg)
             post.nlp_error = error_msg
-            post.nlp_processed_at = datetime.utcnow()
+            post.nlp_processed_at = processed_at
             return False
 
+        post.sentiment_score = result.sentiment.score
+        post.sentiment_label = result.sentiment.label
+
+        # Mark as processed
+        post.nlp_processed_at = processed_at
+        post.nlp_error = None
+
+        logger.debug(
+            "Post %d processed: sentiment=%s, entities=%d",
+            post.id, result.sentiment.label, len(result.entities),
+        )
+        return True
+
     async def _store_entities(
         self,
-        post: Post,
-        entities: list[EntityResult],
+        post_entities: list[tuple[Post, list[EntityResult]]],
         session: AsyncSession
     ) -> None:
         """
-        Store entities with deduplication.
+        Store the entities of one or more posts with deduplication.
 
-        For each entity:
-        1. Check if it already exists in the entities table (by type + normalized text)
-        2. If not, create it
-        3. Create the post_entity junction record
+        1. Upsert every distinct entity (by type + normalized text) across the
+           posts in one statement, returning their IDs whether they are new
+           or existing
+        2. Insert all post_entity junction records in a second statement
         """
-        for entity_result in entities:
-            # Upsert entity (insert or get existing)
-            entity_id = await self._get_or_create_entity(
-                entity_type=entity_result.entity_type,
-                entity_text=entity_result.normalized_text,
-                display_text=entity_result.text,
-                session=session,
-            )
+        # One row per entity; ON CONFLICT DO UPDATE can't touch a row twice
+        entity_rows = {
+            (entity.entity_type, entity.normalized_text): {
+                "entity_type": entity.entity_type,
+                "entity_text": entity.normalized_text,
+                "display_text": entity.text,
+            }
+            for _, entities in post_entities
+            for entity in entities
+        }
+        if not entity_rows:
+            return
 
-            # Create post_entity junction record
-            # Using insert with on_conflict_do_nothing to handle duplicates
-            stmt = insert(PostEntity).values(
-                post_id=post.id,
-                entity_id=entity_id,
-                confidence=entity_result.confidence,
-                start_pos=entity_result.start_pos,
-                end_pos=entity_result.end_pos,
-            )
-            stmt = stmt.on_conflict_do_nothing(
-                constraint="uq_post_entity_pos"
-            )
-            await session.execute(stmt)
+        # The no-op DO UPDATE makes RETURNING include existing entities too,
+        # so no follow-up SELECT is needed for their IDs
+        stmt = insert(Entity).values(list(entity_rows.values()))
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_entity_type_text",
+            set_={"display_text": Entity.__table__.c.display_text},
+        ).returning(Entity.id, Entity.entity_type, Entity.entity_text)
+        result = await session.execute(stmt)
+        entity_ids = {
+            (row.entity_type, row.entity_text): row.id for row in result
+        }
 
-    async def _get_or_create_entity(
-        self,
-        entity_type: str,
-        entity_text: str,
-        display_text: str,
-        session: AsyncSession,
-    ) -> int:
-        """
-        Get existing entity or create new one.
-
-        Uses PostgreSQL upsert to handle race conditions.
-
-        Returns:
-            The entity ID
-        """
-        # Try to insert, on conflict return existing
-        stmt = insert(Entity).values(
-            entity_type=entity_type,
-            entity_text=entity_text,
-            display_text=display_text,
-        )
+        # Create post_entity junction records
+        # Using on_conflict_do_nothing to handle duplicates
+        stmt = insert(PostEntity).values([
+            {
+                "post_id": post.id,
+                "entity_id": entity_ids[(entity.entity_type, entity.normalized_text)],
+                "confidence": entity.confidence,
+                "start_pos": entity.start_pos,
+                "end_pos": entity.end_pos,
+            }
+            for post, entities in post_entities
+            for entity in entities
+        ])
         stmt = stmt.on_conflict_do_nothing(
-            constraint="uq_entity_type_text"
+            constraint="uq_post_entity_pos"
         )
         await session.execute(stmt)
-        await session.flush()
-
-        # Now fetch the entity (either just inserted or existing)
-        result = await session.execute(
-            select(Entity).where(
-                Entity.entity_type == entity_type,
-                Entity.entity_text == entity_text,
-            )
-        )
-        entity = result.scalar_one()
-        return entity.id
 
     async def process_posts_batch(
         self,
@@ -156,6 +195,11 @@ class NLPProcessor:
         """
         Process multiple posts.
 
+        All post contents are analyzed in a single worker thread call, with
+        NER batched through nlp.pipe. The entities of all analyzed posts are
+        then stored together, so an entity mentioned by several posts is
+        upserted once.
+
         Args:
             posts: List of Post objects to process
             session: Database session
@@ -163,17 +207,77 @@ class NLPProcessor:
         Returns:
             Tuple of (success_count, error_count)
         """
+        texts = [post.content for post in posts if post.content]
+        analyzed = iter(await asyncio.to_thread(self.analyze_batch, texts) if texts else [])
+        results = [next(analyzed) if post.content else None for post in posts]
+        # Read once from the database clock that stamps collected_at and
+        # last_polled_at; a plain value keeps the posts' UPDATEs batched
+        processed_at = await session.scalar(select(utc_now()))
+
         success_count = 0
         error_count = 0
+        post_entities = []
 
-        for post in posts:
-            if await self.process_post(post, session):
+        for post, result in zip(posts, results):
+            if self._store_result(post, result, processed_at):
                 success_count += 1
+                if result is not None:
+                    post_entities.append((post, result.entities))
             else:
                 error_count += 1
 
+        await self._store_entities(post_entities, session)
+
         return success_count, error_count
 
+    def notify(self) -> None:
+        """Wake up the background worker to analyze newly committed posts."""
+        self._pending.set()
+
+    async def run_worker(self, on_processed: Callable[[], Awaitable[None]] | None = None) -> None:
+        """
+        Analyze unprocessed posts in the background until cancelled.
+
+        Each time it is notified, the worker waits NLP_BATCH_WAIT for more
+        notifications, then processes posts with no nlp_processed_at in
+        batches of NLP_MAX_BATCH_SIZE, one transaction per batch, until none
+        are left. Pending posts are found in the database rather than passed
+        in, so posts left over from a restart are picked up too.
+
+        Once a run has committed any posts, `on_processed` is awaited, so
+        whatever aggregates their results is only refreshed when they are stored.
+        """
+        while True:
+            await self._pending.wait()
+            await asyncio.sleep(NLP_BATCH_WAIT)
+            self._pending.clear()
+            processed = 0
+            try:
+                while count := await self._process_pending():
+                    processed += count
+            except Exception as e:
+                logger.error("NLP worker batch failed: %s", e)
+            if processed and on_processed is not None:
+                await on_processed()
+
+    async def _process_pending(self) -> int:
+        """Process one batch of unprocessed posts; returns the number of posts processed."""
+        async with async_session() as session:
+            result = await session.execute(
+                select(Post)
+                .where(Post.nlp_processed_at.is_(None))
+                .order_by(Post.id)
+                .limit(NLP_MAX_BATCH_SIZE)
+            )
+            posts = result.scalars().all()
+            if not posts:
+                return 0
+            success_count, error_count = await self.process_posts_batch(posts, session)
+            await session.commit()
+
+        logger.info("NLP processed %d posts (%d errors)", success_count + error_count, error_count)
+        return len(posts)
+
 
 # Global processor instance
 nlp_processor = NLPProcessor()
@@ -1,4 +1,5 @@
 import logging
+import threading
 from dataclasses import dataclass
 
 from LeIA import SentimentIntensityAnalyzer
@@ -7,15 +8,19 @@ logger = logging.getLogger(__name__)
 
 # Global analyzer instance (loaded once)
 _sentiment_analyzer = None
+# NLP runs in worker threads; only one of them should load the model
+_load_lock = threading.Lock()
 
 
 def get_sentiment_analyzer():
     """Get or load the sentiment analyzer (singleton pattern)."""
     global _sentiment_analyzer
     if _sentiment_analyzer is None:
-        logger.info("Loading LeIA sentiment analyzer (Portuguese lexicon-based)")
-        _sentiment_analyzer = SentimentIntensityAnalyzer()
-        logger.info("Sentiment analyzer loaded successfully")
+        with _load_lock:
+            if _sentiment_analyzer is None:
+                logger.info("Loading LeIA sentiment analyzer (Portuguese lexicon-based)")
+                _sentiment_analyzer = SentimentIntensityAnalyzer()
+                logger.info("Sentiment analyzer loaded successfully")
     return _sentiment_analyzer
 
 
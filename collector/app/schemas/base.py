@@ -0,0 +1,24 @@
+from collections.abc import Mapping
+
+from pydantic import BaseModel
+
+
+class RowResponse(BaseModel):
+    """Response model filled from database rows."""
+
+    class Config:
+        from_attributes = True
+
+    @classmethod
+    def from_row(cls, row):
+        """
+        Build the model from an ORM object or row mapping without validating it.
+
+        Only for data read from the database, whose columns already have the
+        field types.
+        """
+        if isinstance(row, Mapping):
+            values = {field: row[field] for field in cls.model_fields}
+        else:
+            values = {field: getattr(row, field) for field in cls.model_fields}
+        return cls.model_construct(**values)
@@ -19,6 +19,10 @@ class SchedulerJob(BaseModel):
     name: str
     next_run_time: datetime | None
 
+    class Config:
+        frozen = True
+        extra = "forbid"
+
 
 class CollectorStatus(BaseModel):
     status: str
@@ -26,3 +30,7 @@ class CollectorStatus(BaseModel):
     threads_configured: bool
     scheduler_running: bool
     jobs: list[SchedulerJob]
+
+    class Config:
+        frozen = True
+        extra = "forbid"
@@ -1,20 +1,17 @@
 from datetime import datetime
 
-from pydantic import BaseModel
+from app.schemas.base import RowResponse
 
 
-class EntityResponse(BaseModel):
+class EntityResponse(RowResponse):
     id: int
     entity_type: str
     entity_text: str
     display_text: str
     created_at: datetime
 
-    class Config:
-        from_attributes = True
 
-
-class PostEntityResponse(BaseModel):
+class PostEntityResponse(RowResponse):
     id: int
     entity_id: int
     entity_type: str
@@ -23,6 +20,3 @@ class PostEntityResponse(BaseModel):
     confidence: float | None
     start_pos: int | None
     end_pos: int | None
-
-    class Config:
-        from_attributes = True
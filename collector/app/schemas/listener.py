@@ -3,6 +3,8 @@ from typing import Literal
 
 from pydantic import BaseModel
 
+from app.schemas.base import RowResponse
+
 
 class ListenerCreate(BaseModel):
     name: str
@@ -12,7 +14,7 @@ class ListenerCreate(BaseModel):
     poll_frequency: int = 300
 
 
-class ListenerResponse(BaseModel):
+class ListenerResponse(RowResponse):
     id: int
     name: str
     platform: str
@@ -24,6 +26,3 @@ class ListenerResponse(BaseModel):
     last_polled_at: datetime | None
     created_at: datetime
     updated_at: datetime
-
-    class Config:
-        from_attributes = True
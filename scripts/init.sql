@@ -15,8 +15,9 @@ CREATE TABLE IF NOT EXISTS listeners (
     initial_scrape_completed  BOOLEAN DEFAULT false,      -- True after first paginated scrape
     poll_frequency            INTEGER DEFAULT 300,        -- Seconds between polls
     last_polled_at            TIMESTAMP,
-    created_at                TIMESTAMP DEFAULT NOW(),
-    updated_at                TIMESTAMP DEFAULT NOW()
+    avg_post_interval         FLOAT,                      -- Moving average of seconds between new posts
+    created_at                TIMESTAMPTZ DEFAULT NOW(),
+    updated_at                TIMESTAMPTZ DEFAULT NOW()
 );
 
 -- Migration: Add initial_scrape_completed column if it doesn't exist (for existing databases)
@@ -30,6 +31,31 @@ BEGIN
     END IF;
 END $$;
 
+-- Migration: Add avg_post_interval column if it doesn't exist (adaptive polling)
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'listeners' AND column_name = 'avg_post_interval'
+    ) THEN
+        ALTER TABLE listeners ADD COLUMN avg_post_interval FLOAT;
+    END IF;
+END $$;
+
+-- Migration: Store listener created_at/updated_at as TIMESTAMPTZ (existing values are UTC)
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'listeners' AND column_name = 'created_at'
+          AND data_type = 'timestamp without time zone'
+    ) THEN
+        ALTER TABLE listeners
+            ALTER COLUMN created_at TYPE TIMESTAMPTZ USING created_at AT TIME ZONE 'UTC',
+            ALTER COLUMN updated_at TYPE TIMESTAMPTZ USING updated_at AT TIME ZONE 'UTC';
+    END IF;
+END $$;
+
 -- ===================
 -- POSTS TABLE
 -- ===================
@@ -61,7 +87,7 @@ CREATE TABLE IF NOT EXISTS posts (
 
     -- Timestamps
     post_created_at     TIMESTAMP,                  -- When post was made on platform
-    collected_at        TIMESTAMP DEFAULT NOW(),    -- When we collected it
+    collected_at        TIMESTAMP DEFAULT timezone('UTC', now()),  -- When we collected it (UTC)
 
     CONSTRAINT uq_platform_post UNIQUE(platform, platform_post_id)
 );
@@ -74,7 +100,7 @@ CREATE TABLE IF NOT EXISTS entities (
     entity_type     VARCHAR(100) NOT NULL,      -- 'PERSON' | 'ORG' | 'PRODUCT' | 'GPE' | etc.
     entity_text     VARCHAR(500) NOT NULL,      -- Normalized text (lowercase)
     display_text    VARCHAR(500) NOT NULL,      -- Original text as found
-    created_at      TIMESTAMP DEFAULT NOW(),
+    created_at      TIMESTAMP DEFAULT timezone('UTC', now()),
 
     CONSTRAINT uq_entity_type_text UNIQUE(entity_type, entity_text)
 );
@@ -89,11 +115,16 @@ CREATE TABLE IF NOT EXISTS post_entities (
     confidence  FLOAT,                          -- NER confidence score
     start_pos   INTEGER,                        -- Position in post content
     end_pos     INTEGER,
-    created_at  TIMESTAMP DEFAULT NOW(),
+    created_at  TIMESTAMP DEFAULT timezone('UTC', now()),
 
     CONSTRAINT uq_post_entity_pos UNIQUE(post_id, entity_id, start_pos)
 );
 
+-- Migration: Naive timestamps default to UTC, not the session time zone
+ALTER TABLE posts ALTER COLUMN collected_at SET DEFAULT timezone('UTC', now());
+ALTER TABLE entities ALTER COLUMN created_at SET DEFAULT timezone('UTC', now());
+ALTER TABLE post_entities ALTER COLUMN created_at SET DEFAULT timezone('UTC', now());
+
 -- ===================
 -- INDEXES
 -- ===================
@@ -103,12 +134,117 @@ CREATE INDEX IF NOT EXISTS idx_posts_collected_at ON posts(collected_at DESC);
 CREATE INDEX IF NOT EXISTS idx_posts_sentiment ON posts(sentiment_label);
 CREATE INDEX IF NOT EXISTS idx_posts_author ON posts(author_handle);
 CREATE INDEX IF NOT EXISTS idx_posts_nlp_error ON posts(nlp_error) WHERE nlp_error IS NOT NULL;
+-- Posts waiting for the collector's NLP worker
+CREATE INDEX IF NOT EXISTS idx_posts_nlp_pending ON posts(id) WHERE nlp_processed_at IS NULL;
+
+-- Composite indexes backing the per-listener analytics filters and GROUP BYs
+CREATE INDEX IF NOT EXISTS idx_posts_listener_collected ON posts(listener_id, collected_at DESC);
+CREATE INDEX IF NOT EXISTS idx_posts_listener_post_created ON posts(listener_id, post_created_at DESC)
+    WHERE post_created_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_posts_listener_sentiment ON posts(listener_id, sentiment_label)
+    WHERE sentiment_label IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_posts_listener_platform ON posts(listener_id, platform);
+CREATE INDEX IF NOT EXISTS idx_posts_listener_author ON posts(listener_id, author_handle)
+    WHERE author_handle IS NOT NULL;
+
+-- Posts list order (keyset pagination), alone and behind each equality filter
+CREATE INDEX IF NOT EXISTS idx_posts_created_id ON posts(post_created_at DESC NULLS LAST, id DESC);
+CREATE INDEX IF NOT EXISTS idx_posts_listener_created_id
+    ON posts(listener_id, post_created_at DESC NULLS LAST, id DESC);
+CREATE INDEX IF NOT EXISTS idx_posts_platform_created_id
+    ON posts(platform, post_created_at DESC NULLS LAST, id DESC);
+CREATE INDEX IF NOT EXISTS idx_posts_sentiment_created_id
+    ON posts(sentiment_label, post_created_at DESC NULLS LAST, id DESC);
+
+-- Trigram index for the author_handle ILIKE '%...%' filter
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_posts_author_trgm ON posts USING gin (author_handle gin_trgm_ops);
 
 CREATE INDEX IF NOT EXISTS idx_entities_type ON entities(entity_type);
 CREATE INDEX IF NOT EXISTS idx_entities_text ON entities(entity_text);
 
 CREATE INDEX IF NOT EXISTS idx_post_entities_post ON post_entities(post_id);
 CREATE INDEX IF NOT EXISTS idx_post_entities_entity ON post_entities(entity_id);
+CREATE INDEX IF NOT EXISTS idx_post_entities_entity_post ON post_entities(entity_id, post_id);
+
+-- ===================
+-- ENTITY OCCURRENCE ROLLUP
+-- ===================
+-- Mentions per entity and listener, backing the top entities endpoint.
+-- Refreshed by the collector after each scheduled collection.
+CREATE MATERIALIZED VIEW IF NOT EXISTS entity_occurrence_counts AS
+SELECT
+    pe.entity_id,
+    p.listener_id,
+    count(*) AS occurrence_count
+FROM post_entities pe
+JOIN posts p ON p.id = pe.post_id
+GROUP BY pe.entity_id, p.listener_id;
+
+-- Unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_entity_occurrence_counts_entity_listener
+    ON entity_occurrence_counts(entity_id, listener_id);
+CREATE INDEX IF NOT EXISTS idx_entity_occurrence_counts_listener
+    ON entity_occurrence_counts(listener_id, occurrence_count DESC);
+
+-- ===================
+-- DAILY POST ROLLUP
+-- ===================
+-- Posts per creation day, listener, platform and sentiment, backing the
+-- analytics overview and sentiment breakdown. Refreshed by the collector.
+CREATE MATERIALIZED VIEW IF NOT EXISTS post_daily_counts AS
+SELECT
+    date_trunc('day', post_created_at) AS day,
+    listener_id,
+    platform,
+    sentiment_label,
+    count(*) AS post_count
+FROM posts
+GROUP BY 1, 2, 3, 4;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_post_daily_counts_key
+    ON post_daily_counts(day, listener_id, platform, sentiment_label) NULLS NOT DISTINCT;
+CREATE INDEX IF NOT EXISTS idx_post_daily_counts_listener_day
+    ON post_daily_counts(listener_id, day);
+
+-- Bumped by the collector after each rollup refresh; part of the API's ETags
+CREATE SEQUENCE IF NOT EXISTS rollup_refresh_seq;
+
+-- Bumped on every DELETE from posts (directly or through a listener's cascade);
+-- part of the API's ETags, since deletes don't move the latest collected_at
+CREATE SEQUENCE IF NOT EXISTS posts_delete_seq;
+
+CREATE OR REPLACE FUNCTION bump_posts_delete_seq() RETURNS trigger AS $$
+BEGIN
+    PERFORM nextval('posts_delete_seq');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_posts_delete_seq ON posts;
+CREATE TRIGGER trg_posts_delete_seq
+    AFTER DELETE ON posts
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_posts_delete_seq();
+
+-- Bumped by every statement that updates posts rows (engagement counters
+-- refreshed by the collection upsert, NLP results); part of the API's post
+-- list ETags. The transition table skips upserts whose conflicts changed nothing.
+CREATE SEQUENCE IF NOT EXISTS posts_update_seq;
+
+CREATE OR REPLACE FUNCTION bump_posts_update_seq() RETURNS trigger AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM updated_posts) THEN
+        PERFORM nextval('posts_update_seq');
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_posts_update_seq ON posts;
+CREATE TRIGGER trg_posts_update_seq
+    AFTER UPDATE ON posts
+    REFERENCING NEW TABLE AS updated_posts
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_posts_update_seq();
 
 -- ===================
 -- DONE